@@ -37,6 +37,15 @@ if not YOUTUBE_API_KEY:
     print("To enable extraction, create a .env file with: YOUTUBE_API_KEY=your_key_here")
     YOUTUBE_API_KEY = None  # Allow analysis steps to proceed
 
+# Optional: multiple YouTube keys for quota rotation
+# Each key has its own daily quota, so rotating across several keys
+# multiplies how much a batch run can extract before hitting the cap.
+# Set in .env as a comma-separated list: YOUTUBE_API_KEYS=key1,key2,key3
+# Falls back to a one-key list built from YOUTUBE_API_KEY above.
+YOUTUBE_API_KEYS = [k.strip() for k in os.getenv("YOUTUBE_API_KEYS", "").split(",") if k.strip()]
+if not YOUTUBE_API_KEYS and YOUTUBE_API_KEY:
+    YOUTUBE_API_KEYS = [YOUTUBE_API_KEY]
+
 # Supadata API Key (for transcript fetching)
 # Loads from .env file or environment variable
 # Note: Only required for extraction (Step 2). Analysis steps work without it.
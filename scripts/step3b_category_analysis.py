@@ -22,6 +22,15 @@ import csv
 # json is used to load metadata files such as video title and channel name
 import json
 
+# gzip is used to read the compressed transcript files step 2 now writes
+import gzip
+
+# re is used to pull the video id out of each youtube url in the input csv
+import re
+
+# compiled once at import so the per-row loop in main just calls search
+_URL_ID_RE = re.compile(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})')
+
 # this adds the parent project folder to the Python path
 # so the script can import config.py and utility files correctly
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -46,6 +55,10 @@ from scripts.utils.nlp_processor import (
     count_sensitive_matches,
 )
 
+# shared mtime-keyed json cache - metadata files read by step 3 or step 4
+# come straight from memory here
+from scripts.utils.json_cache import load_json
+
 
 def load_algospeak_dict():
     # try to load the algospeak dictionary and its category lookup function
@@ -109,7 +122,6 @@ def main():
     output_path = os.path.join(output_dir, 'category_analysis.csv')
 
     # load ad_status values from video_urls.csv so they can be matched back to each video
-    import re as re_mod
     ad_status_lookup = {}
     input_csv_path = os.path.join(base_dir, DATA_INPUT_DIR, 'video_urls.csv')
 
@@ -120,7 +132,7 @@ def main():
                 url = row.get('url', '')
 
                 # extract the YouTube video ID from either a standard or shortened URL
-                match = re_mod.search(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})', url)
+                match = _URL_ID_RE.search(url)
 
                 if match:
                     ad_status_lookup[match.group(1)] = row.get('ad_status', '')
@@ -138,11 +150,13 @@ def main():
         print("ERROR: No raw data directory found. Run step 2 first.")
         sys.exit(1)
 
-    # collect all video folders that contain a transcript.txt file
+    # collect all video folders that contain a transcript file
+    # newer extractions store transcript.txt.gz, older ones transcript.txt
     video_ids = sorted([
         d for d in os.listdir(raw_dir)
         if os.path.isdir(os.path.join(raw_dir, d))
-        and os.path.exists(os.path.join(raw_dir, d, 'transcript.txt'))
+        and (os.path.exists(os.path.join(raw_dir, d, 'transcript.txt.gz'))
+             or os.path.exists(os.path.join(raw_dir, d, 'transcript.txt')))
     ])
 
     # stop if no usable videos were found
@@ -170,22 +184,23 @@ def main():
     for i, video_id in enumerate(video_ids, 1):
         print(f"[{i}/{len(video_ids)}] Analyzing: {video_id}")
 
-        # load the transcript text
+        # load the transcript text (compressed if available, else plain)
+        gz_path = os.path.join(raw_dir, video_id, 'transcript.txt.gz')
         transcript_path = os.path.join(raw_dir, video_id, 'transcript.txt')
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            transcript = f.read()
+        if os.path.exists(gz_path):
+            with gzip.open(gz_path, 'rt', encoding='utf-8') as f:
+                transcript = f.read()
+        else:
+            with open(transcript_path, 'r', encoding='utf-8') as f:
+                transcript = f.read()
 
         # skip videos with empty transcripts
         if not transcript:
             print("  SKIP: Empty transcript")
             continue
 
-        # load metadata if available
-        metadata_path = os.path.join(raw_dir, video_id, 'metadata.json')
-        metadata = {}
-        if os.path.exists(metadata_path):
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+        # load metadata if available, through the shared cache
+        metadata = load_json(os.path.join(raw_dir, video_id, 'metadata.json')) or {}
 
         # count sensitive words by category
         sensitive_by_cat = analyze_transcript_by_category(transcript, sensitive_words_path)
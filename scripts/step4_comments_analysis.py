@@ -23,6 +23,13 @@ import json
 # re is python's regular expression module, used here for keyword matching with word boundaries
 import re
 
+# runs the per-video comment scanning on several cpu cores at once,
+# same pattern as the transcript analysis in step 3
+from concurrent.futures import ProcessPoolExecutor
+
+# pins the fixed arguments so only the video id varies per task
+from functools import partial
+
 # add parent directory to the system path so internal modules can be imported
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -34,6 +41,13 @@ except ImportError:
     print("ERROR: config.py not found!")
     sys.exit(1)
 
+# shared mtime-keyed json cache so metadata files already parsed by
+# step 3 (or an earlier run) are not parsed again here
+# loads picks orjson when installed, stdlib json otherwise - comments
+# files are the biggest json this step parses, so the faster parser
+# helps most here
+from scripts.utils.json_cache import load_json, loads
+
 
 def load_perception_keywords(dictionaries_dir: str) -> dict:
     # this function loads the monetisation perception keywords from a json file
@@ -68,84 +82,132 @@ def load_perception_keywords(dictionaries_dir: str) -> dict:
 
 
 def get_extracted_videos(raw_dir: str) -> list:
-    # this function finds all video folders that contain a comments.json file
+    # this function finds all video folders that contain a comments file
     # those are the videos that already have extracted comments and can be analysed
-    if not os.path.exists(raw_dir):
-        return []
-    
     video_ids = []
-    
-    for item in os.listdir(raw_dir):
-        item_path = os.path.join(raw_dir, item)
-        
-        # only check folders, because each video should have its own folder
-        if os.path.isdir(item_path):
-            comments_path = os.path.join(item_path, 'comments.json')
-            
-            # if comments.json exists, add this video id to the list
-            if os.path.exists(comments_path):
-                video_ids.append(item)
-    
+
+    # scandir instead of listdir plus per-entry isdir/exists checks -
+    # the DirEntry already knows it is a directory, so this is one stat
+    # per video folder instead of three
+    try:
+        with os.scandir(raw_dir) as entries:
+            for entry in entries:
+                # only check folders, because each video should have its own folder
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+
+                # newer extractions write comments.jsonl, older ones comments.json
+                for name in ('comments.jsonl', 'comments.json'):
+                    if os.path.exists(os.path.join(entry.path, name)):
+                        video_ids.append(entry.name)
+                        break
+    except FileNotFoundError:
+        # the raw data folder does not exist yet
+        return []
+
     # return video ids in sorted order for cleaner output
     return sorted(video_ids)
 
 
 def load_comments(raw_dir: str, video_id: str) -> list:
     # this function loads all comments for one video
+    # newer extractions save comments.jsonl (one comment thread per line),
+    # older ones save a single comments.json list - both are supported
+    jsonl_path = os.path.join(raw_dir, video_id, 'comments.jsonl')
     comments_path = os.path.join(raw_dir, video_id, 'comments.json')
-    
-    if os.path.exists(comments_path):
-        with open(comments_path, 'r', encoding='utf-8') as f:
-            comments = json.load(f)
-        
-        # comments.json may contain top-level comments with replies nested inside
+
+    comments = None
+
+    # try each candidate file directly instead of stat-ing it first
+    try:
+        # stream the jsonl file line by line instead of one big parse
+        # each line goes through the shared loads helper (orjson if installed)
+        with open(jsonl_path, 'rb') as f:
+            comments = []
+            for line in f:
+                line = line.strip()
+                if line:
+                    comments.append(loads(line))
+    except FileNotFoundError:
+        try:
+            with open(comments_path, 'rb') as f:
+                comments = loads(f.read())
+        except FileNotFoundError:
+            pass
+
+    if comments is not None:
+        # the comment threads have replies nested inside
         # this part flattens everything into one list so all comments can be checked equally
         all_comments = []
-        
+
         for comment in comments:
             all_comments.append(comment)
             all_comments.extend(comment.get('replies', []))
-        
+
         return all_comments
-    
-    # if the file does not exist, return an empty list
+
+    # if no comments file exists, return an empty list
     return []
 
 
 def load_metadata(raw_dir: str, video_id: str) -> dict:
     # this function loads metadata for a video, such as title and channel information
+    # goes through the shared mtime-keyed cache so repeated reads are free
     metadata_path = os.path.join(raw_dir, video_id, 'metadata.json')
-    
-    if os.path.exists(metadata_path):
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
+
     # if metadata is missing, return an empty dictionary instead of crashing
-    return {}
+    return load_json(metadata_path) or {}
+
+
+def compile_keyword_matcher(keywords_dict: dict) -> tuple:
+    # fuse every perception keyword into one compiled regex alternation
+    # so each comment is scanned once, instead of one search per keyword
+    # returns the compiled pattern plus a lookup from the matched text
+    # back to its (category, keyword) pairs
+
+    # a keyword can in theory sit in more than one category, so the
+    # lookup keeps a list of pairs per keyword
+    kw_to_pairs = {}
+    for category, keywords in keywords_dict.items():
+        for keyword in keywords:
+            kw_to_pairs.setdefault(keyword.lower(), []).append((category, keyword))
+
+    # longest keywords first so "not monetized" wins over "monetized"
+    # when both could match at the same spot
+    ordered = sorted(kw_to_pairs, key=len, reverse=True)
+
+    # keep the original matching rules inside the one fused pattern:
+    # single words get word boundaries (so "ad" does not match inside
+    # "shadow"), but phrases and hyphenated terms stay plain substrings
+    # (so "brand safe" still matches "brand safety" and "limited ad"
+    # still matches "limited ads", just like the per-keyword checks did)
+    phrases = [k for k in ordered if ' ' in k or '-' in k]
+    singles = [k for k in ordered if ' ' not in k and '-' not in k]
+
+    parts = []
+    if phrases:
+        # phrase branch first so "not monetized" wins over "monetized"
+        parts.append('(?:' + '|'.join(re.escape(k) for k in phrases) + ')')
+    if singles:
+        parts.append(r'\b(?:' + '|'.join(re.escape(k) for k in singles) + r')\b')
+
+    pattern = re.compile('|'.join(parts))
 
+    return pattern, kw_to_pairs
 
-def search_comment_with_word_boundaries(text: str, keywords_dict: dict) -> list:
+
+def search_comment_with_word_boundaries(text: str, matcher: tuple) -> list:
     # this function checks one comment for any perception keywords
     # it returns a list of matches in the form (category, keyword)
+    # matcher comes from compile_keyword_matcher, built once per run
+    pattern, kw_to_pairs = matcher
     text_lower = text.lower()
     matches = []
-    
-    for category, keywords in keywords_dict.items():
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            
-            # if a keyword has spaces or hyphens, simple substring matching is used
-            # this is easier for phrases like "not monetized" or "de-monetised"
-            if ' ' in keyword_lower or '-' in keyword_lower:
-                if keyword_lower in text_lower:
-                    matches.append((category, keyword))
-            else:
-                # for single words, use regex word boundaries
-                # this avoids false matches such as matching "ad" inside "shadow"
-                pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-                if re.search(pattern, text_lower):
-                    matches.append((category, keyword))
-    
+
+    # one pass over the comment finds every keyword from every category
+    for m in pattern.finditer(text_lower):
+        matches.extend(kw_to_pairs[m.group(0)])
+
     return matches
 
 
@@ -156,6 +218,108 @@ def is_creator_comment(comment: dict, channel_id: str) -> bool:
     return author_channel_id == channel_id
 
 
+def analyze_video_comments(video_id: str, raw_dir: str, matcher: tuple, categories: tuple) -> dict:
+    # scan one video's comments - this runs inside a worker process, so
+    # it only reads files and returns plain dicts; all printing and the
+    # running totals stay in the parent process
+    comments = load_comments(raw_dir, video_id)
+    metadata = load_metadata(raw_dir, video_id)
+    channel_id = metadata.get('channel_id', '')
+    channel_name = metadata.get('channel_name', '')
+
+    # signal videos with no loadable comments back to the parent
+    if not comments:
+        return None
+
+    # these counters are for just this one video
+    video_matches = 0
+    creator_matches = 0
+    viewer_matches = 0
+    creator_comment_count = 0
+
+    # set up a counter for each perception category
+    category_counts = {cat: 0 for cat in categories}
+
+    # detailed rows for every matched comment in this video
+    matched_rows = []
+
+    # whole-video prescan: join every comment into one buffer and scan it
+    # once - most videos have no perception talk at all, and those skip
+    # the per-comment matching below entirely
+    # the newline separator cannot create a false cross-comment phrase
+    # match because the keywords never contain newlines
+    pattern = matcher[0]
+    all_text = '\n'.join(c.get('text', '') for c in comments)
+    video_has_hits = pattern.search(all_text.lower()) is not None
+
+    for comment in comments:
+        text = comment.get('text', '')
+        is_reply = comment.get('is_reply', False)
+        is_creator = is_creator_comment(comment, channel_id)
+
+        # count how many total creator comments there are
+        if is_creator:
+            creator_comment_count += 1
+
+        # search the current comment for perception-related keywords
+        # (skipped when the prescan proved this video has none at all)
+        matches = search_comment_with_word_boundaries(text, matcher) if video_has_hits else []
+
+        if matches:
+            # this comment contains at least one perception keyword
+            video_matches += 1
+
+            # keep track of whether the match came from the creator or a viewer
+            if is_creator:
+                creator_matches += 1
+            else:
+                viewer_matches += 1
+
+            # remove duplicates so the same category/keyword is not repeated in one comment
+            categories_found = list(set([m[0] for m in matches]))
+            keywords_found = list(set([m[1] for m in matches]))
+
+            # increase the count for each category found in this comment
+            for cat in categories_found:
+                category_counts[cat] += 1
+
+            # save one detailed output row for this matched comment
+            matched_rows.append({
+                'video_id': video_id,
+                'video_title': metadata.get('title', '')[:50],
+                'is_creator': is_creator,
+                'is_reply': is_reply,
+                'comment_author': comment.get('author', ''),
+                'comment_likes': comment.get('like_count', 0),
+                'comment_text': text[:500].replace('\n', ' '),
+                'categories_matched': ', '.join(categories_found),
+                'keywords_matched': ', '.join(keywords_found)
+            })
+
+    # one summary row for this video
+    summary = {
+        'video_id': video_id,
+        'title': metadata.get('title', ''),
+        'channel_name': channel_name,
+        'total_comments': len(comments),
+        'creator_comments': creator_comment_count,
+        'perception_comments': video_matches,
+        'creator_perception': creator_matches,
+        'viewer_perception': viewer_matches,
+        'perception_ratio': round(video_matches / len(comments) * 100, 2) if comments else 0,
+        **{f'{cat}_mentions': count for cat, count in category_counts.items()}
+    }
+
+    # hand everything back so the parent can aggregate and print
+    return {
+        'matched_rows': matched_rows,
+        'summary': summary,
+        'creator_comments': creator_comment_count,
+        'creator_matches': creator_matches,
+        'viewer_matches': viewer_matches,
+    }
+
+
 def main():
     # build the main folder paths used in the script
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -173,6 +337,9 @@ def main():
         print(f"Check: {os.path.join(dictionaries_dir, 'perception_keywords.json')}")
         sys.exit(1)
     
+    # build the fused keyword pattern once for the whole run
+    keyword_matcher = compile_keyword_matcher(PERCEPTION_KEYWORDS)
+
     # get all video ids that already have extracted comments
     video_ids = get_extracted_videos(raw_dir)
     
@@ -190,129 +357,92 @@ def main():
     # create the output folder if it does not already exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # these lists will store:
-    # - all matched comments in detail
-    # - one summary row per video
-    all_matches = []
-    video_summaries = []
-    
+    # both csvs are written row by row as videos finish, so memory stays
+    # flat however many comments the dataset has
+    # each file opens lazily on its first row because the column names
+    # come from that row's keys
+    summary_path = output_path.replace('.csv', '_summary.csv')
+    matches_file = None
+    matches_writer = None
+    match_fields = None
+    matches_written = 0
+    summary_file = None
+    summary_writer = None
+    summary_fields = None
+    summaries_written = 0
+
     # these counters track totals across the whole dataset
     total_creator_comments = 0
     total_creator_matches = 0
     total_viewer_comments = 0
     total_viewer_matches = 0
+    total_perception = 0
+    total_comments = 0
     
-    for i, video_id in enumerate(video_ids, 1):
-        # process one video at a time
-        print(f"[{i}/{len(video_ids)}] Analyzing comments: {video_id}")
-        
-        comments = load_comments(raw_dir, video_id)
-        metadata = load_metadata(raw_dir, video_id)
-        channel_id = metadata.get('channel_id', '')
-        channel_name = metadata.get('channel_name', '')
-        
-        if not comments:
-            # skip videos where no comments were loaded
-            print(f"  SKIP: No comments")
-            continue
-        
-        # these counters are for just this one video
-        video_matches = 0
-        creator_matches = 0
-        viewer_matches = 0
-        creator_comment_count = 0
-        
-        # set up a counter for each perception category
-        category_counts = {cat: 0 for cat in PERCEPTION_KEYWORDS.keys()}
-        
-        for comment in comments:
-            text = comment.get('text', '')
-            is_reply = comment.get('is_reply', False)
-            is_creator = is_creator_comment(comment, channel_id)
-            
-            # count how many total creator comments there are
-            if is_creator:
-                creator_comment_count += 1
-            
-            # search the current comment for perception-related keywords
-            matches = search_comment_with_word_boundaries(text, PERCEPTION_KEYWORDS)
-            
-            if matches:
-                # this comment contains at least one perception keyword
-                video_matches += 1
-                
-                # keep track of whether the match came from the creator or a viewer
-                if is_creator:
-                    creator_matches += 1
-                else:
-                    viewer_matches += 1
-                
-                # remove duplicates so the same category/keyword is not repeated in one comment
-                categories_found = list(set([m[0] for m in matches]))
-                keywords_found = list(set([m[1] for m in matches]))
-                
-                # increase the count for each category found in this comment
-                for cat in categories_found:
-                    category_counts[cat] += 1
-                
-                # save one detailed output row for this matched comment
-                all_matches.append({
-                    'video_id': video_id,
-                    'video_title': metadata.get('title', '')[:50],
-                    'is_creator': is_creator,
-                    'is_reply': is_reply,
-                    'comment_author': comment.get('author', ''),
-                    'comment_likes': comment.get('like_count', 0),
-                    'comment_text': text[:500].replace('\n', ' '),
-                    'categories_matched': ', '.join(categories_found),
-                    'keywords_matched': ', '.join(keywords_found)
-                })
-        
-        # update the overall totals after finishing this video
-        total_creator_comments += creator_comment_count
-        total_creator_matches += creator_matches
-        total_viewer_comments += len(comments) - creator_comment_count
-        total_viewer_matches += viewer_matches
-        
-        # save one summary row for this video
-        video_summaries.append({
-            'video_id': video_id,
-            'title': metadata.get('title', ''),
-            'channel_name': channel_name,
-            'total_comments': len(comments),
-            'creator_comments': creator_comment_count,
-            'perception_comments': video_matches,
-            'creator_perception': creator_matches,
-            'viewer_perception': viewer_matches,
-            'perception_ratio': round(video_matches / len(comments) * 100, 2) if comments else 0,
-            **{f'{cat}_mentions': count for cat, count in category_counts.items()}
-        })
-        
-        # print a short progress summary for this video
-        print(f"  Comments: {len(comments)} (creator: {creator_comment_count}) | "
-              f"Perception: {video_matches} (creator: {creator_matches}, viewers: {viewer_matches})")
+    # scan videos in parallel across cpu cores, same setup as step 3
+    # ex.map keeps results in video-id order so the output stays stable
+    worker = partial(analyze_video_comments, raw_dir=raw_dir, matcher=keyword_matcher,
+                     categories=tuple(PERCEPTION_KEYWORDS.keys()))
+
+    with ProcessPoolExecutor() as executor:
+        for i, (video_id, outcome) in enumerate(
+                zip(video_ids, executor.map(worker, video_ids, chunksize=4)), 1):
+            print(f"[{i}/{len(video_ids)}] Analyzing comments: {video_id}")
+
+            if outcome is None:
+                # skip videos where no comments were loaded
+                print(f"  SKIP: No comments")
+                continue
+
+            summary = outcome['summary']
+
+            # update the overall totals after finishing this video
+            total_creator_comments += outcome['creator_comments']
+            total_creator_matches += outcome['creator_matches']
+            total_viewer_comments += summary['total_comments'] - outcome['creator_comments']
+            total_viewer_matches += outcome['viewer_matches']
+
+            # stream the detailed rows for this video straight to disk
+            if outcome['matched_rows']:
+                if matches_writer is None:
+                    match_fields = list(outcome['matched_rows'][0].keys())
+                    matches_file = open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+                    matches_writer = csv.writer(matches_file)
+                    matches_writer.writerow(match_fields)
+
+                matches_writer.writerows(
+                    [row.get(name, '') for name in match_fields]
+                    for row in outcome['matched_rows'])
+                matches_written += len(outcome['matched_rows'])
+
+            # stream the per-video summary row the same way
+            if summary_writer is None:
+                summary_fields = list(summary.keys())
+                summary_file = open(summary_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
+                summary_writer = csv.writer(summary_file)
+                summary_writer.writerow(summary_fields)
+
+            summary_writer.writerow([summary.get(name, 0) for name in summary_fields])
+            summaries_written += 1
+
+            # running totals for the final printout
+            total_perception += summary['perception_comments']
+            total_comments += summary['total_comments']
+
+            # print a short progress summary for this video
+            print(f"  Comments: {summary['total_comments']} (creator: {outcome['creator_comments']}) | "
+                  f"Perception: {summary['perception_comments']} "
+                  f"(creator: {outcome['creator_matches']}, viewers: {outcome['viewer_matches']})")
     
-    # write the detailed matched comments to csv
-    if all_matches:
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=list(all_matches[0].keys()))
-            writer.writeheader()
-            writer.writerows(all_matches)
+    # close the streamed csvs and report where they went
+    if matches_file is not None:
+        matches_file.close()
         print(f"\nSUCCESS: Detailed matches saved to {output_path}")
-    
-    # write the per-video summary csv
-    summary_path = output_path.replace('.csv', '_summary.csv')
-    if video_summaries:
-        with open(summary_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=list(video_summaries[0].keys()))
-            writer.writeheader()
-            writer.writerows(video_summaries)
+
+    if summary_file is not None:
+        summary_file.close()
         print(f"SUCCESS: Video summary saved to {summary_path}")
-    
-    # compute totals across all videos for the final printout
-    total_perception = sum(v['perception_comments'] for v in video_summaries)
-    total_comments = sum(v['total_comments'] for v in video_summaries)
-    
+
     print(f"\nSummary: {total_comments:,} comments analyzed | {total_perception} with perception keywords")
     print(f"Creator: {total_creator_matches}/{total_creator_comments} | Viewer: {total_viewer_matches}/{total_viewer_comments:,}")
     print("Next: Run step5_algospeak_detection.py")
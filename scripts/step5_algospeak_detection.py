@@ -23,8 +23,8 @@ import os
 # csv is used to read and write csv output files
 import csv
 
-# json is used to load comment files and metadata stored in json format
-import json
+# gzip is used to read the compressed transcript files step 2 now writes
+import gzip
 
 # re is python's regular expression module, used here to match algospeak terms safely
 import re
@@ -35,6 +35,10 @@ import argparse
 # datetime is used to create timestamped archive folder names
 from datetime import datetime
 
+# background threads prefetch the next videos' files from disk while the
+# current video is being scanned, so the scan never waits on reads
+from concurrent.futures import ThreadPoolExecutor
+
 # add parent directory to the system path so python can import config and project utilities
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -53,71 +57,108 @@ from scripts.utils.algospeak_dict import (
     get_category
 )
 
+# shared mtime-keyed json cache, same as steps 3 and 4, so metadata
+# already parsed by an earlier step is not parsed again here
+# loads picks orjson when installed, stdlib json otherwise
+from scripts.utils.json_cache import load_json, loads
+
 def get_extracted_videos(raw_dir: str) -> list:
     # this function finds all video folders that already contain transcript or comment data
-    if not os.path.exists(raw_dir):
-        return []
-    
     video_ids = []
-    
-    for item in os.listdir(raw_dir):
-        item_path = os.path.join(raw_dir, item)
-        
-        if os.path.isdir(item_path):
-            # check whether this video folder has either a transcript or comments
-            has_transcript = os.path.exists(os.path.join(item_path, 'transcript.txt'))
-            has_comments = os.path.exists(os.path.join(item_path, 'comments.json'))
-            
-            if has_transcript or has_comments:
-                video_ids.append(item)
-    
+
+    # scandir instead of listdir plus per-entry isdir/exists checks -
+    # the DirEntry already knows it is a directory, and the inner loop
+    # stops at the first file that proves the folder has data
+    try:
+        with os.scandir(raw_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+
+                # newer extractions store transcript.txt.gz and comments.jsonl,
+                # older ones transcript.txt and comments.json - any one of
+                # these means the video has analysable data
+                for name in ('transcript.txt.gz', 'transcript.txt',
+                             'comments.jsonl', 'comments.json'):
+                    if os.path.exists(os.path.join(entry.path, name)):
+                        video_ids.append(entry.name)
+                        break
+    except FileNotFoundError:
+        # the raw data folder does not exist yet
+        return []
+
     # sort the ids to keep processing order tidy and consistent
     return sorted(video_ids)
 
 
 def load_transcript(raw_dir: str, video_id: str) -> str:
     # this function loads the transcript text for one video
+    # newer extractions store it gzip-compressed, older ones as plain text
+    gz_path = os.path.join(raw_dir, video_id, 'transcript.txt.gz')
     transcript_path = os.path.join(raw_dir, video_id, 'transcript.txt')
-    
-    if os.path.exists(transcript_path):
+
+    # try each candidate directly instead of a separate exists stat first
+    try:
+        with gzip.open(gz_path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    try:
         with open(transcript_path, 'r', encoding='utf-8') as f:
             return f.read()
-    
-    # return an empty string if no transcript exists
-    return ""
+    except FileNotFoundError:
+        # return an empty string if no transcript exists
+        return ""
 
 
 def load_comments(raw_dir: str, video_id: str) -> list:
     # this function loads comments for one video, including replies
+    # newer extractions save comments.jsonl (one comment thread per line),
+    # older ones save a single comments.json list - both are supported
+    jsonl_path = os.path.join(raw_dir, video_id, 'comments.jsonl')
     comments_path = os.path.join(raw_dir, video_id, 'comments.json')
-    
-    if os.path.exists(comments_path):
-        with open(comments_path, 'r', encoding='utf-8') as f:
-            comments = json.load(f)
-        
+
+    comments = None
+
+    # try each candidate file directly instead of stat-ing it first
+    try:
+        # stream the jsonl file line by line instead of one big parse
+        # each line goes through the shared loads helper (orjson if installed)
+        with open(jsonl_path, 'rb') as f:
+            comments = []
+            for line in f:
+                line = line.strip()
+                if line:
+                    comments.append(loads(line))
+    except FileNotFoundError:
+        try:
+            with open(comments_path, 'rb') as f:
+                comments = loads(f.read())
+        except FileNotFoundError:
+            pass
+
+    if comments is not None:
         # flatten the structure so top-level comments and replies are all in one list
         all_comments = []
         for comment in comments:
             all_comments.append(comment)
             for reply in comment.get('replies', []):
                 all_comments.append(reply)
-        
+
         return all_comments
-    
+
     # return an empty list if there is no comments file
     return []
 
 
 def load_metadata(raw_dir: str, video_id: str) -> dict:
     # this function loads metadata such as title, channel id, and publication date
+    # goes through the shared mtime-keyed cache so repeated reads are free
     metadata_path = os.path.join(raw_dir, video_id, 'metadata.json')
-    
-    if os.path.exists(metadata_path):
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    # return an empty dictionary if metadata is missing
-    return {}
+
+    # if metadata is missing, return an empty dictionary instead of crashing
+    return load_json(metadata_path) or {}
 
 
 def detect_algospeak_with_boundaries(text: str) -> list:
@@ -179,7 +220,13 @@ def detect_algospeak_with_boundaries(text: str) -> list:
 def archive_output(output_dir: str) -> str:
     # this function makes a backup copy of the current output folder
     # it saves the backup inside an archive folder with a timestamped name
-    if not os.path.exists(output_dir) or not os.listdir(output_dir):
+    # any(os.scandir(...)) stops at the first entry instead of building
+    # the whole name list the way os.listdir does
+    try:
+        with os.scandir(output_dir) as it:
+            if not any(it):
+                return None
+    except FileNotFoundError:
         return None
     
     archive_dir = os.path.join(os.path.dirname(output_dir), 'archive')
@@ -263,13 +310,33 @@ def main():
     all_findings = []
     video_summaries = []
     
+    # prefetch window: while one video is being scanned (cpu work), the
+    # next few videos' files are already being read on background threads
+    # file reads release the GIL, so the overlap is real
+    PREFETCH = 4
+
+    def load_video_files(vid):
+        # everything a loop iteration needs from disk, in one bundle
+        return (load_transcript(raw_dir, vid),
+                load_comments(raw_dir, vid),
+                load_metadata(raw_dir, vid))
+
+    prefetcher = ThreadPoolExecutor(max_workers=PREFETCH)
+    pending = {vid: prefetcher.submit(load_video_files, vid)
+               for vid in video_ids[:PREFETCH]}
+
     for i, video_id in enumerate(video_ids, 1):
         print(f"[{i}/{len(video_ids)}] Scanning: {video_id}")
-        
-        transcript = load_transcript(raw_dir, video_id)
-        comments = load_comments(raw_dir, video_id)
-        metadata = load_metadata(raw_dir, video_id)
+
+        # collect this video's files (usually already loaded by now)
+        transcript, comments, metadata = pending.pop(video_id).result()
         channel_id = metadata.get('channel_id', '')
+
+        # top up the window with the next video past the in-flight ones
+        next_index = i + PREFETCH - 1
+        if next_index < len(video_ids):
+            next_vid = video_ids[next_index]
+            pending[next_vid] = prefetcher.submit(load_video_files, next_vid)
         
         # counters for transcript and comments
         transcript_instances = 0
@@ -359,6 +426,9 @@ def main():
         print(f"  Transcript: {transcript_instances} instances ({transcript_unique} unique)")
         print(f"  Comments: {comment_instances} instances ({comment_unique} unique, creator: {creator_comment_instances})")
     
+# the prefetch threads are done once the loop has consumed every future
+    prefetcher.shutdown()
+
 # if skip-existing was used, add the old rows back in so the new csvs contain everything
     all_findings = existing_findings + all_findings
     video_summaries = existing_summaries + video_summaries
@@ -380,11 +450,15 @@ def main():
             writer.writerows(video_summaries)
         print(f"SUCCESS: Video summary saved to {summary_path}")
     
-# compute totals across all videos
+# compute totals across all videos in a single pass instead of three
     # int() is used because rows loaded from an existing csv come in as strings
-    total_transcript = sum(int(v['transcript_instances']) for v in video_summaries)
-    total_comment = sum(int(v['comment_instances']) for v in video_summaries)
-    total_creator_comment = sum(int(v['creator_comment_instances']) for v in video_summaries)
+    total_transcript = 0
+    total_comment = 0
+    total_creator_comment = 0
+    for v in video_summaries:
+        total_transcript += int(v['transcript_instances'])
+        total_comment += int(v['comment_instances'])
+        total_creator_comment += int(v['creator_comment_instances'])
     
     print(f"\nSummary: {len(video_summaries)} videos | Transcript: {total_transcript} | Comments: {total_comment}")
     print(f"Creator comments: {total_creator_comment} | Viewer comments: {total_comment - total_creator_comment}")
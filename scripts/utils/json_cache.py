@@ -0,0 +1,52 @@
+# json cache
+#
+# 1. small helper that loads json files with an in-memory cache
+# 2. the cache key includes the file's modification time, so editing a
+#    file on disk automatically invalidates its cached copy
+# 3. this matters because several steps read the same small files over
+#    and over - step 3 and step 4 both open every video's metadata.json,
+#    and re-runs during dictionary tuning reload everything again
+# 4. callers must treat the returned objects as read-only, because the
+#    same parsed object is handed to every caller
+
+# json parses the file contents into dicts and lists
+import json
+
+# os gives us the stat call that provides the modification time
+import os
+
+# lru_cache stores the parsed results keyed by (path, mtime)
+from functools import lru_cache
+
+# orjson parses json several times faster than the stdlib, but it is
+# optional - everything falls back to the standard parser without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    # parse json bytes/text with the fastest parser available
+    # shared here so other steps can reuse the same optional import
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=4096)
+def _load(path: str, mtime_ns: int):
+    # mtime_ns is not used inside the function - it only exists so that
+    # a changed file gets a different cache key and is parsed again
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def load_json(path: str, default=None):
+    # load a json file through the cache
+    # a missing file returns the default instead of raising, because the
+    # analysis steps treat absent metadata as an empty dict anyway
+    try:
+        return _load(path, os.stat(path).st_mtime_ns)
+    except (FileNotFoundError, NotADirectoryError):
+        return default
@@ -1,7 +1,5 @@
 # nlp processor
 #
-# nlp processor
-#
 # 1. prepares transcript text for analysis by tokenising, cleaning, and lemmatising it
 # 2. loads the sensitive-word dictionary from JSON files
 # 3. counts both single-word and phrase-based sensitive matches
@@ -26,6 +24,16 @@ import json
 # - finding the user's home directory for nltk_data
 import os
 
+# re is part of Python's standard library.
+# We use it to fuse all the phrase terms into one compiled pattern,
+# so each transcript is scanned once instead of once per phrase
+import re
+
+# lru_cache is part of Python's standard library (functools).
+# It keeps the compiled phrase pattern around between calls,
+# because every transcript uses the same dictionary
+from functools import lru_cache
+
 # string is part of Python's standard library.
 # We use it mainly for string.punctuation, which gives us a ready-made
 # list of punctuation characters like . , ! ? : ; and so on
@@ -153,9 +161,14 @@ ensure_nltk_resources()
 _lemmatizer = WordNetLemmatizer()
 
 
+@lru_cache(maxsize=8)
 def load_sensitive_words(filepath: str) -> tuple:
     """reads the sensitive words json and splits them into single words vs multi-word
     phrases - we need to handle these differently during matching."""
+
+    # cached per path: analyze_transcript runs once per video, and
+    # re-reading and re-parsing the same json for every video is wasted
+    # work - callers must not mutate the returned structures
     with open(filepath, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
@@ -181,11 +194,13 @@ def load_sensitive_words(filepath: str) -> tuple:
     return singles, phrases
 
 
+@lru_cache(maxsize=8)
 def load_sensitive_words_by_category(filepath: str) -> dict:
     """same as load_sensitive_words but grouped by category
-    returns dict of category_name -> (singles_set, phrases_list)."""
+    returns dict of category_name -> (singles_set, phrases_list).
+    cached per path just like load_sensitive_words - do not mutate the result."""
 
-     """
+    """
     Load sensitive words grouped by category from JSON.
 
     Expected structure:
@@ -259,9 +274,13 @@ def analyze_transcript_by_category(transcript_text: str, sensitive_words_path: s
     # clean and lemmatise transcript once, then reuse it for every category
     tokens = clean_and_lemmatize(transcript_text)
 
+    # lowercase once here too - count_sensitive_matches takes the already
+    # lowered text, so each category does not re-lower the whole transcript
+    raw_lower = transcript_text.lower()
+
     result = {}
     for cat_name, (singles, phrases) in categories.items():
-        count, found = count_sensitive_matches(transcript_text, tokens, singles, phrases)
+        count, found = count_sensitive_matches(raw_lower, tokens, singles, phrases)
         # count matches for just this category
         result[cat_name] = {
             'count': count,
@@ -319,12 +338,26 @@ def clean_and_lemmatize(text: str) -> list:
 
     return clean_tokens
 
-def count_sensitive_matches(raw_text: str, tokens: list,
+@lru_cache(maxsize=32)
+def _compile_phrase_pattern(phrase_terms: tuple):
+    """builds one regex that matches any of the phrase terms, so a transcript
+    only needs a single scan no matter how many phrases the dictionary has."""
+
+    # longest phrases go first so overlapping entries like "drug" and
+    # "drug use" prefer the longer, more specific match
+    ordered = sorted(phrase_terms, key=len, reverse=True)
+
+    # escape each phrase so characters like '-' are matched literally
+    return re.compile('|'.join(re.escape(p) for p in ordered))
+
+
+def count_sensitive_matches(raw_lower: str, tokens: list,
                            single_terms: set, phrase_terms: list) -> tuple:
     """counts how many sensitive terms appear. phrases get checked against the raw
-    text (since tokenising breaks them up), singles get checked against lemmatised tokens."""
+    lowercased text (since tokenising breaks them up), singles get checked against
+    lemmatised tokens. callers lowercase once so category loops do not redo it."""
 
-     """
+    """
     count sensitive-term matches in a transcript
 
     Matching logic:
@@ -345,25 +378,32 @@ def count_sensitive_matches(raw_text: str, tokens: list,
     count = 0
     found = []
 
-    # Lowercase the raw text for case-insensitive phrase matching
-    raw_lower = raw_text.lower()
+    # raw_lower arrives already lowercased for case-insensitive matching
 
     # phrases need raw text matching since they span multiple tokens
     # Example: detect "self harm" in the original transcript text.
-    for phrase in phrase_terms:
-        matches = raw_lower.count(phrase)
-
+    # all phrases are fused into one compiled pattern, so the transcript
+    # is scanned once here instead of once per phrase
+    if phrase_terms:
+        pattern = _compile_phrase_pattern(tuple(phrase_terms))
+        hits = pattern.findall(raw_lower)
 
-        if matches > 0:
-            count += matches
-            found.append(phrase)
+        if hits:
+            count += len(hits)
+            found.extend(set(hits))
 
     # single words match against our lemmatised token list
     # Example: detect "kill" in the cleaned token list.
-    for token in tokens:
-        if token in single_terms:
-            count += 1
-            found.append(token)
+    # cheap prefilter first: intersect the dictionary with the transcript
+    # vocabulary in one c-level pass - most transcripts are clean, and
+    # they bail out here without walking every token in python
+    matched_singles = single_terms.intersection(tokens)
+
+    if matched_singles:
+        for token in tokens:
+            if token in matched_singles:
+                count += 1
+        found.extend(matched_singles)
  
  # Convert found terms to a unique list so repeated matches do not repeat in output.
     return count, list(set(found))
@@ -411,8 +451,9 @@ def analyze_transcript(transcript_text: str, sensitive_words_path: str) -> dict:
     total_words = len(tokens)
 
     # count sensitive matches using both phrase and token matching strategies
+    # the text is lowercased here because count_sensitive_matches expects it
     sensitive_count, found_terms = count_sensitive_matches(
-        transcript_text, tokens, singles, phrases
+        transcript_text.lower(), tokens, singles, phrases
     )
 
     # convert raw count into a percentage of transcript length
@@ -157,7 +157,7 @@ def get_video_metadata(api_key: str, video_id: str) -> dict:
 # gets subscriber count, total views, video count for a channel
 def get_channel_info(api_key: str, channel_id: str) -> dict:
 
-"""
+    """
     Retrieve basic information about a YouTube channel.
 
     This includes:
@@ -202,7 +202,7 @@ def get_video_transcript(video_id: str, max_retries: int = 3) -> tuple:
     """grabs the english transcript for a video. has exponential backoff for
     rate limits and falls back through several methods if the first one fails."""
     import time
-"""
+    """
     Retrieve a transcript for a YouTube video.
 
     Strategy:
@@ -463,7 +463,7 @@ def save_video_data(output_dir: str, video_id: str, metadata: dict,
         with open(os.path.join(video_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
 
-     if transcript_text: #save full transcript text as plain text for easy reading
+    if transcript_text: #save full transcript text as plain text for easy reading
         with open(os.path.join(video_dir, 'transcript.txt'), 'w', encoding='utf-8') as f:
             f.write(transcript_text)
 